@@ -0,0 +1,224 @@
+"""The scan benchmark. It serves a mock Joomla site (bench.mock_joomla) and runs
+scan() against it at several thread counts, each run in a fresh process so
+its CPU time and peak RSS are its own, and writes the requests per second,
+wall time, CPU time and peak RSS of every run to a JSON file. Two such files,
+from two commits, are compared with the compare command.
+
+    python -m bench.bench run --threads 1,4,16 --output before.json
+    python -m bench.bench compare before.json after.json
+"""
+
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import rich
+from rich import print
+from typer import Option, Typer
+from typing_extensions import Annotated
+
+from bench.mock_joomla import Site, serve
+
+app = Typer()
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def commit() -> str | None:
+    """The commit being benchmarked, marked dirty when there are changes."""
+    try:
+        head = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no", "."],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return head + ("-dirty" if dirty else "")
+
+
+@app.command()
+def one(
+    url: str,
+    threads: int,
+    engine: str = "threads",
+    limit: int = 1000,
+    components: str | None = None,
+):
+    """Runs one scan and prints its measurements as JSON. Used by run."""
+    # The scan's console output would only measure the terminal.
+    devnull = open(os.devnull, "w")
+    rich.reconfigure(file=devnull)
+
+    from joom3y.components import database
+    from joom3y.findings import FindingWriter
+    from joom3y.joom3y import scan
+    from joom3y.metrics import Metrics
+
+    metrics = Metrics()
+    findings = FindingWriter("jsonl", Path(os.devnull))
+    start = time.perf_counter()
+    scan(
+        url,
+        "joom3y-bench",
+        threads=threads,
+        engine=engine,
+        limit=limit,
+        components=database().select(components),
+        findings=findings,
+        metrics=metrics,
+    )
+    findings.close()
+    wall = time.perf_counter() - start
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    sys.stdout.write(
+        json.dumps(
+            {
+                "requests": metrics.requests,
+                "wall": wall,
+                "cpu": usage.ru_utime + usage.ru_stime,
+                "requests_per_second": metrics.requests / wall,
+                # ru_maxrss is in KiB on Linux and in bytes on macOS.
+                "peak_rss_kib": usage.ru_maxrss
+                // (1024 if sys.platform == "darwin" else 1),
+            }
+        )
+        + "\n"
+    )
+
+
+@app.command()
+def run(
+    threads: Annotated[
+        str, Option("--threads", "-t", help="Comma-separated thread counts.")
+    ] = "1,4,16",
+    engine: Annotated[
+        str,
+        Option("--engine", "-e", help="The scan engine, threads or async."),
+    ] = "threads",
+    repeat: Annotated[
+        int, Option("--repeat", "-r", help="Runs per thread count.")
+    ] = 3,
+    installed: Annotated[
+        int, Option("--installed", help="Components installed on the site.")
+    ] = 30,
+    latency: Annotated[
+        float, Option("--latency", help="Seconds added to every response.")
+    ] = 0.0,
+    soft404: Annotated[
+        bool, Option("--soft404", help="Answer unknown options with 200.")
+    ] = False,
+    listings: Annotated[
+        bool, Option(help="Serve directory listings of component directories.")
+    ] = True,
+    components: Annotated[
+        str | None,
+        Option(
+            "--components", "-c", help="Glob patterns of components to scan."
+        ),
+    ] = None,
+    output: Annotated[
+        Path, Option("--output", "-o", help="The JSON file of results.")
+    ] = Path("bench.json"),
+):
+    """Benchmarks scan() at each thread count and writes the results."""
+    site = Site.sample(
+        installed, listings=listings, soft404=soft404, latency=latency
+    )
+    server = serve(site)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = []
+    for count in (int(t) for t in threads.split(",")):
+        runs = []
+        for _ in range(repeat):
+            # The parent also serves the site, so the scan gets a process of
+            # its own and its rusage is only the scan's.
+            command = [sys.executable, "-m", "bench.bench", "one", url]
+            command += [str(count), "--engine", engine, "--limit", str(count)]
+            if components:
+                command += ["--components", components]
+            child = subprocess.run(
+                command, cwd=ROOT, capture_output=True, text=True, check=True
+            )
+            runs.append(json.loads(child.stdout.splitlines()[-1]))
+
+        result = {"threads": count}
+        # The median run, by wall time, so one noisy run doesn't skew it.
+        result.update(sorted(runs, key=lambda r: r["wall"])[len(runs) // 2])
+        result["wall_runs"] = [r["wall"] for r in runs]
+        results.append(result)
+        print(
+            f"[blue]{count} threads: {result['requests_per_second']:.0f} "
+            f"req/s, {result['wall']:.2f}s wall, {result['cpu']:.2f}s CPU, "
+            f"{result['peak_rss_kib'] / 1024:.0f} MiB peak RSS"
+        )
+    server.shutdown()
+
+    output.write_text(
+        json.dumps(
+            {
+                "commit": commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "engine": engine,
+                "site": {
+                    "installed": installed,
+                    "latency": latency,
+                    "soft404": soft404,
+                    "listings": listings,
+                    "components": components,
+                },
+                "results": results,
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+    print(f"[green]Results written to {output}")
+
+
+@app.command()
+def compare(before: Path, after: Path):
+    """Compares two result files, run by run."""
+    old, new = (json.loads(path.read_text()) for path in (before, after))
+    if old["site"] != new["site"] or old["engine"] != new["engine"]:
+        print("[yellow]The two files benchmarked different setups.")
+
+    print(f"{old['commit']} -> {new['commit']}")
+    baseline = {r["threads"]: r for r in old["results"]}
+    for result in new["results"]:
+        previous = baseline.get(result["threads"])
+        if previous is None:
+            continue
+        changes = ", ".join(
+            f"{key} {previous[key]:.2f} -> {result[key]:.2f} "
+            f"({(result[key] / previous[key] - 1) * 100:+.1f}%)"
+            for key in ("requests_per_second", "wall", "cpu", "peak_rss_kib")
+            if previous[key]
+        )
+        spread = statistics.pstdev(result["wall_runs"])
+        print(
+            f"{result['threads']} threads: {changes} "
+            f"(wall spread {spread:.2f}s)"
+        )
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,170 @@
+"""The --http2 check. It serves the mock Joomla site over HTTPS (bench.mock_h2)
+with a throwaway certificate and scans it with the async engine three times:
+over HTTP/1.1, with --http2, and with --http2 against a server that only
+offers HTTP/1.1. It checks that the HTTP/2 scan multiplexed its requests
+over a few connections, that the last one fell back to HTTP/1.1, and that
+all three found the same, and exits with 1 when any check fails. It needs
+the h2 package and the openssl command.
+
+    python -m bench.http2 --limit 200 --latency 0.01
+"""
+
+import json
+import os
+import ssl
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import rich
+from rich import print
+from typer import Exit, Option, Typer
+from typing_extensions import Annotated
+
+from bench.mock_h2 import H2Server
+from bench.mock_joomla import Site
+
+app = Typer()
+
+
+def certificate(directory: Path) -> tuple[Path, Path]:
+    """A self-signed certificate for 127.0.0.1 and its key."""
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes"]
+        + ["-days", "1", "-subj", "/CN=127.0.0.1"]
+        + ["-addext", "subjectAltName=IP:127.0.0.1"]
+        + ["-keyout", str(key), "-out", str(cert)],
+        capture_output=True,
+        check=True,
+    )
+    return cert, key
+
+
+def context(cert: Path, key: Path, protocols: list[str]) -> ssl.SSLContext:
+    """A server TLS context offering protocols by ALPN."""
+    server = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server.load_cert_chain(cert, key)
+    server.set_alpn_protocols(protocols)
+    return server
+
+
+def measure(url: str, http2: bool, limit: int, directory: Path) -> dict:
+    """Scans url with the async engine and returns its measurements."""
+    from joom3y.components import database
+    from joom3y.findings import FindingWriter
+    from joom3y.joom3y import scan
+    from joom3y.metrics import Metrics
+
+    output = directory / "findings.jsonl"
+    metrics = Metrics()
+    findings = FindingWriter("jsonl", output)
+    start = time.perf_counter()
+    scan(
+        url,
+        "joom3y-bench",
+        engine="async",
+        limit=limit,
+        components=database().select(),
+        findings=findings,
+        metrics=metrics,
+        http2=http2,
+    )
+    findings.close()
+    wall = time.perf_counter() - start
+
+    found = sorted(
+        (record["kind"], record["path"], record["status"])
+        for record in map(json.loads, output.read_text().splitlines())
+    )
+    return {
+        "wall": wall,
+        "requests": metrics.requests,
+        "protocols": dict(metrics.protocols),
+        "found": found,
+    }
+
+
+@app.command()
+def main(
+    limit: Annotated[
+        int, Option("--limit", "-l", help="Requests in flight.")
+    ] = 200,
+    installed: Annotated[
+        int, Option("--installed", help="Components installed on the site.")
+    ] = 30,
+    latency: Annotated[
+        float, Option("--latency", help="Seconds added to every response.")
+    ] = 0.01,
+    max_connections: Annotated[
+        int,
+        Option(
+            "--max-connections",
+            help="Connections the HTTP/2 scan may open, at most.",
+        ),
+    ] = 8,
+):
+    """Checks --http2 against local HTTP/2 and HTTP/1.1 servers."""
+    site = Site.sample(installed, latency=latency)
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        cert, key = certificate(directory)
+        # Trusted by requests, for the calibration, and by httpx.
+        os.environ["REQUESTS_CA_BUNDLE"] = os.environ["SSL_CERT_FILE"] = str(
+            cert
+        )
+        # The scans' console output would only measure the terminal.
+        devnull = open(os.devnull, "w")
+
+        runs = {}
+        for name, protocols, http2 in (
+            ("HTTP/1.1", ["h2", "http/1.1"], False),
+            ("HTTP/2", ["h2", "http/1.1"], True),
+            ("fallback", ["http/1.1"], True),
+        ):
+            server = H2Server(site, context(cert, key, protocols))
+            url = f"https://127.0.0.1:{server.server_address[1]}"
+            rich.reconfigure(file=devnull)
+            try:
+                run = measure(url, http2, limit, directory)
+            finally:
+                rich.reconfigure()
+                server.shutdown()
+            run["connections"] = dict(server.connections)
+            runs[name] = run
+            print(
+                f"[blue]{name}: {run['requests']} requests in "
+                f"{run['wall']:.2f}s, connections {run['connections']}, "
+                f"responses {run['protocols']}"
+            )
+        devnull.close()
+
+    multiplexed = runs["HTTP/2"]
+    opened = multiplexed["connections"].get("h2", 0)
+    if set(multiplexed["protocols"]) != {"HTTP/2"}:
+        print("[red]The --http2 scan did not get HTTP/2 responses only.")
+        failed = True
+    if not 0 < opened <= max_connections:
+        print(
+            f"[red]The --http2 scan opened {opened} HTTP/2 connections, "
+            f"more than {max_connections}."
+        )
+        failed = True
+    if set(runs["fallback"]["protocols"]) != {"HTTP/1.1"}:
+        print("[red]The --http2 scan of an HTTP/1.1 server did not fall back.")
+        failed = True
+    if len({str(run["found"]) for run in runs.values()}) != 1:
+        print("[red]The scans found different things.")
+        failed = True
+    if failed:
+        raise Exit(1)
+    print(
+        f"[green]HTTP/2 multiplexed {multiplexed['requests']} requests over "
+        f"{opened} connections, and fell back to HTTP/1.1."
+    )
+
+
+if __name__ == "__main__":
+    app()
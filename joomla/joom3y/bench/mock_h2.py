@@ -0,0 +1,169 @@
+"""An HTTPS front for the mock Joomla site of bench.mock_joomla. Like nginx, it
+speaks HTTP/2 to the clients that negotiate h2 by ALPN and HTTP/1.1 to the
+others, and it counts the connections of each, so bench.http2 can check how
+many sockets a scan used. It runs an asyncio loop on a background thread and
+needs the h2 package.
+"""
+
+import asyncio
+import ssl
+import threading
+from collections import Counter
+from http import HTTPStatus
+
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import ConnectionTerminated, RequestReceived, WindowUpdated
+from h2.exceptions import ProtocolError, StreamClosedError
+
+from bench.mock_joomla import Site
+
+
+class H2Server:
+    """Serves a Site over TLS on a background thread. Port 0 picks a free
+    port, read it back from server_address.
+
+    Args:
+        site (Site): The site to serve.
+        context (ssl.SSLContext): The server's TLS context. Its ALPN
+            protocols decide whether clients can get HTTP/2.
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+    """
+
+    def __init__(
+        self,
+        site: Site,
+        context: ssl.SSLContext,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.site = site
+        # Connections accepted, by negotiated protocol.
+        self.connections: Counter[str] = Counter()
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._serve, host, port, ssl=context),
+            self.loop,
+        ).result()
+        self.server_address = self.server.sockets[0].getsockname()
+
+    def shutdown(self):
+        async def close():
+            self.server.close()
+
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def _serve(self, reader, writer):
+        protocol = writer.get_extra_info("ssl_object").selected_alpn_protocol()
+        protocol = protocol or "http/1.1"
+        self.connections[protocol] += 1
+        try:
+            if protocol == "h2":
+                await self._serve_h2(reader, writer)
+            else:
+                await self._serve_h1(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_h1(self, reader, writer):
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            request = head.split(b"\r\n", 1)[0].decode("latin-1")
+            method, path, _ = request.split(" ", 2)
+            if self.site.latency:
+                await asyncio.sleep(self.site.latency)
+            status, content = self.site.respond(path)
+            writer.write(
+                f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                f"Content-Type: text/html\r\n"
+                f"Content-Length: {len(content)}\r\n\r\n".encode()
+            )
+            if method != "HEAD":
+                writer.write(content)
+            await writer.drain()
+
+    async def _serve_h2(self, reader, writer):
+        connection = H2Connection(
+            H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        connection.initiate_connection()
+        writer.write(connection.data_to_send())
+        # Responses waiting for the client to open its flow-control window.
+        waiting: list[asyncio.Future] = []
+        responses = set()
+        try:
+            while data := await reader.read(65536):
+                try:
+                    events = connection.receive_data(data)
+                except ProtocolError:
+                    break
+                for event in events:
+                    if isinstance(event, RequestReceived):
+                        headers = dict(event.headers)
+                        task = asyncio.create_task(
+                            self._respond_h2(
+                                connection,
+                                writer,
+                                waiting,
+                                event.stream_id,
+                                headers[":method"],
+                                headers[":path"],
+                            )
+                        )
+                        responses.add(task)
+                        task.add_done_callback(responses.discard)
+                    elif isinstance(event, WindowUpdated):
+                        for waiter in waiting:
+                            if not waiter.done():
+                                waiter.set_result(None)
+                        waiting.clear()
+                    elif isinstance(event, ConnectionTerminated):
+                        return
+                writer.write(connection.data_to_send())
+        finally:
+            for task in responses:
+                task.cancel()
+
+    async def _respond_h2(
+        self, connection, writer, waiting, stream_id, method, path
+    ):
+        if self.site.latency:
+            await asyncio.sleep(self.site.latency)
+        status, content = self.site.respond(path)
+        body = b"" if method == "HEAD" else content
+        try:
+            connection.send_headers(
+                stream_id,
+                [
+                    (":status", str(status)),
+                    ("content-type", "text/html"),
+                    ("content-length", str(len(content))),
+                ],
+                end_stream=not body,
+            )
+            while body:
+                size = min(
+                    connection.local_flow_control_window(stream_id),
+                    connection.max_outbound_frame_size,
+                    len(body),
+                )
+                if size <= 0:
+                    writer.write(connection.data_to_send())
+                    waiter = asyncio.get_running_loop().create_future()
+                    waiting.append(waiter)
+                    await waiter
+                    continue
+                connection.send_data(
+                    stream_id, body[:size], end_stream=size == len(body)
+                )
+                body = body[size:]
+        except (StreamClosedError, ProtocolError):
+            # Reset by the client, like an existence probe that stopped
+            # reading.
+            return
+        writer.write(connection.data_to_send())
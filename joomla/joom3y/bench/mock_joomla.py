@@ -0,0 +1,231 @@
+"""A local HTTP server emulating a Joomla site, for benchmarks. It answers the
+probes joom3y sends the way a real site would, for a chosen set of installed
+components, with their artifact files, optional directory listings, optional
+soft-404 pages, optional case-insensitive paths, optional gzipped bodies
+and an optional delay on every response.
+
+    python -m bench.mock_joomla --port 8765 --installed 30 --latency 0.01
+"""
+
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from typer import Option, Typer
+from typing_extensions import Annotated
+
+from joom3y.components import database
+
+app = Typer()
+
+
+class Site:
+    """The contents of the mock site.
+
+    Args:
+        components (list[str]): The installed components.
+        artifacts (bool): Whether installed components have a README, a
+            manifest, an index file and the artifacts the component
+            database knows for them.
+        listings (bool): Whether the site directories of installed
+            components, and their subdirectories, answer with an
+            Apache-style directory listing of their files. Listed
+            directories also hold a docs/CHANGELOG.txt.
+        soft404 (bool): Whether unknown options answer 200 with the home
+            page instead of 404.
+        latency (float): The seconds added to every response.
+        case_insensitive (bool): Whether paths resolve whatever their case,
+            as on IIS.
+        compress (bool): Whether bodies are gzipped for the clients that
+            accept it.
+    """
+
+    def __init__(
+        self,
+        components: list[str],
+        artifacts: bool = True,
+        listings: bool = True,
+        soft404: bool = False,
+        latency: float = 0.0,
+        case_insensitive: bool = False,
+        compress: bool = False,
+    ):
+        self.components = set(components)
+        self.compress = compress
+        self.soft404 = soft404
+        self.latency = latency
+        self.case_insensitive = case_insensitive
+        self.files = {
+            "/": b"<html><title>Home</title>Welcome</html>",
+            "/robots.txt": b"User-agent: *\nDisallow: /administrator/\n",
+            "/README.txt": b"Joomla! 3.10\nversion 3.10.12\n",
+        }
+        self.listings = {}
+        for component in components:
+            site = "/components/" + component + "/"
+            admin = "/administrator/components/" + component + "/"
+            if artifacts:
+                self.files[site + "README.txt"] = b"version 1.0.0\n" * 20
+                self.files[site + "index.html"] = b"<html></html>" * 100
+                self.files[admin + component[4:] + ".xml"] = (
+                    b"<extension><version>1.0.0</version></extension>"
+                )
+                record = database().get(component)
+                for artifact in record.artifacts if record else ():
+                    self.files[admin + artifact] = b"<?php // 1.0.0\n"
+            if listings:
+                self.files[site + "docs/CHANGELOG.txt"] = b"1.0.0 - Initial\n"
+                self.listings[site] = None
+        for directory in list(self.listings):
+            self._list(directory)
+        if case_insensitive:
+            self.files = {
+                path.lower(): body for path, body in self.files.items()
+            }
+            self.listings = {
+                path.lower(): body for path, body in self.listings.items()
+            }
+
+    def _list(self, directory: str):
+        """Lists directory, and its subdirectories, the way Apache does."""
+        names = set()
+        for path in self.files:
+            if path.startswith(directory):
+                name, slash, _ = path[len(directory) :].partition("/")
+                names.add(name + slash)
+        names = sorted(names)
+        links = [
+            b"<a href='?C=N;O=D'>Name</a>",
+            b"<a href='../'>Parent Directory</a>",
+        ]
+        links += [f"<a href='{name}'>{name}</a>".encode() for name in names]
+        self.listings[directory] = (
+            b"<html><head><title>Index of " + directory.encode() + b"</title>"
+            b"</head><body>" + b"\n".join(links) + b"</body></html>"
+        )
+        for name in names:
+            if name.endswith("/"):
+                self._list(directory + name)
+
+    @classmethod
+    def sample(cls, installed: int, **kwargs) -> "Site":
+        """A site with installed components spread evenly over the
+        component database, so they land all over the scan order."""
+        names = list(database())
+        step = max(1, len(names) // max(1, installed))
+        return cls(names[::step][:installed], **kwargs)
+
+    def respond(self, path: str) -> tuple[int, bytes]:
+        if path.startswith("/index.php?option="):
+            component = path.split("=", 1)[1]
+            if component in self.components:
+                return 200, b"<html><title>" + component.encode() + b"</title>"
+            if self.soft404:
+                return 200, self.files["/"]
+            return 404, b"Not Found"
+        if self.case_insensitive:
+            path = path.lower()
+        if path in self.files:
+            return 200, self.files[path]
+        if path in self.listings:
+            return 200, self.listings[path]
+        for prefix in ("/components/", "/administrator/components/"):
+            if path.startswith(prefix):
+                component = path[len(prefix) :].strip("/")
+                if component in self.components:
+                    return 403, b"Forbidden"
+        return 404, b"Not Found"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Without it every response waits on the client's delayed ACK.
+    disable_nagle_algorithm = True
+    site: Site
+
+    def log_message(self, *_):
+        pass
+
+    def _respond(self, body: bool):
+        if self.site.latency:
+            time.sleep(self.site.latency)
+        status, content = self.site.respond(self.path)
+        self.send_response(status)
+        if self.site.compress and "gzip" in self.headers.get(
+            "Accept-Encoding", ""
+        ):
+            content = gzip.compress(content)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        if body:
+            self.wfile.write(content)
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 4096
+
+
+def serve(site: Site, host: str = "127.0.0.1", port: int = 0) -> Server:
+    """Starts serving site on a background thread. Port 0 picks a free port,
+    read it back from server.server_address."""
+    handler = type("SiteHandler", (Handler,), {"site": site})
+    server = Server((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@app.command()
+def main(
+    port: Annotated[
+        int, Option("--port", "-p", help="The port to serve on.")
+    ] = 8765,
+    installed: Annotated[
+        int, Option("--installed", help="The number of installed components.")
+    ] = 30,
+    latency: Annotated[
+        float, Option("--latency", help="Seconds added to every response.")
+    ] = 0.0,
+    soft404: Annotated[
+        bool, Option("--soft404", help="Answer unknown options with 200.")
+    ] = False,
+    listings: Annotated[
+        bool, Option(help="Serve directory listings of component directories.")
+    ] = True,
+    case_insensitive: Annotated[
+        bool,
+        Option(
+            "--case-insensitive", help="Resolve paths whatever their case."
+        ),
+    ] = False,
+    compress: Annotated[
+        bool, Option("--gzip", help="Gzip the bodies of the responses.")
+    ] = False,
+):
+    site = Site.sample(
+        installed,
+        listings=listings,
+        soft404=soft404,
+        latency=latency,
+        case_insensitive=case_insensitive,
+        compress=compress,
+    )
+    server = serve(site, port=port)
+    print(f"Serving {len(site.components)} components on port {port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,114 @@
+"""The --record and --replay round trip. It serves the mock Joomla site with
+gzipped bodies and listings, records a scan of it with each engine, replays
+every recording with both engines, and checks that the replays find what
+the recorded scans found without a request missing from the archive or a
+failed one. It exits with 1 when any check fails.
+
+    python -m bench.replay --installed 10
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import rich
+from rich import print
+from typer import Exit, Option, Typer
+from typing_extensions import Annotated
+
+from bench.mock_joomla import Site, serve
+
+app = Typer()
+
+ENGINES = ("threads", "async")
+
+
+def run(url: str, engine: str, archive, directory: Path) -> dict:
+    """Scans url, through archive, and returns what it found."""
+    from joom3y.components import database
+    from joom3y.findings import FindingWriter
+    from joom3y.joom3y import scan
+    from joom3y.metrics import Metrics
+
+    output = directory / "findings.jsonl"
+    metrics = Metrics()
+    findings = FindingWriter("jsonl", output)
+    scan(
+        url,
+        "joom3y-bench",
+        threads=8,
+        engine=engine,
+        limit=50,
+        components=database().select(),
+        findings=findings,
+        metrics=metrics,
+        archive=archive,
+    )
+    findings.close()
+    return {
+        "found": sorted(
+            (record["kind"], record["path"])
+            for record in map(json.loads, output.read_text().splitlines())
+        ),
+        "failed": metrics.errors + metrics.timeouts,
+    }
+
+
+@app.command()
+def main(
+    installed: Annotated[
+        int, Option("--installed", help="Components installed on the site.")
+    ] = 10,
+):
+    """Checks that recorded scans replay the same on both engines."""
+    from joom3y.archive import Archive
+
+    site = Site.sample(installed, compress=True)
+    server = serve(site)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    failed = False
+    # The scans' console output would only measure the terminal.
+    devnull = open(os.devnull, "w")
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        for recorder in ENGINES:
+            path = directory / recorder
+            archive = Archive(path)
+            rich.reconfigure(file=devnull)
+            try:
+                recorded = run(url, recorder, archive, directory)
+            finally:
+                archive.close()
+                rich.reconfigure()
+            for engine in ENGINES:
+                archive = Archive(path, replay=True)
+                rich.reconfigure(file=devnull)
+                try:
+                    replayed = run(url, engine, archive, directory)
+                finally:
+                    archive.close()
+                    rich.reconfigure()
+                name = f"{recorder} recording replayed with {engine}"
+                if replayed["found"] != recorded["found"]:
+                    print(f"[red]The {name} found different things.")
+                    failed = True
+                if archive.missed or replayed["failed"]:
+                    print(
+                        f"[red]The {name} missed {archive.missed} requests "
+                        f"and failed {replayed['failed']}."
+                    )
+                    failed = True
+                print(
+                    f"[blue]{name}: {archive.requests} requests, "
+                    f"{len(replayed['found'])} findings"
+                )
+    devnull.close()
+    server.shutdown()
+    if failed:
+        raise Exit(1)
+    print("[green]Every recording replayed the same on both engines.")
+
+
+if __name__ == "__main__":
+    app()
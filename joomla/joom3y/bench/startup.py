@@ -0,0 +1,86 @@
+"""The CLI startup budget. Wrapper scripts run joom3y thousands of times, so
+importing main.py has to stay cheap: the HTTP stack, asyncio and the scan
+machinery are only imported once the arguments have been parsed. This
+imports main in fresh interpreters, checks that none of the deferred modules
+came along and that the median import time is within the budget, and exits
+with 1 when either regresses, so it can gate CI.
+
+    python -m bench.startup --budget 100
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+from rich import print
+from typer import Exit, Option, Typer
+from typing_extensions import Annotated
+
+from bench.bench import ROOT
+
+app = Typer()
+
+# Modules that importing main.py must not load.
+DEFERRED = (
+    "requests",
+    "urllib3",
+    "httpx",
+    "asyncio",
+    "faker",
+    "rich.progress",
+    "joom3y.joom3y",
+    "joom3y.transport",
+)
+
+# Run in the child, timing only the import of main, not interpreter startup.
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "modules": sorted(sys.modules)}))
+"""
+
+
+@app.command()
+def main(
+    budget: Annotated[
+        float,
+        Option("--budget", help="The median import time allowed, in ms."),
+    ] = 100.0,
+    repeat: Annotated[
+        int, Option("--repeat", "-r", help="Fresh interpreters to time.")
+    ] = 10,
+):
+    """Times the import of main.py and checks what it loads."""
+    runs = []
+    for _ in range(repeat):
+        child = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        runs.append(json.loads(child.stdout.splitlines()[-1]))
+
+    failed = False
+    loaded = sorted(set(DEFERRED).intersection(runs[0]["modules"]))
+    if loaded:
+        print(f"[red]Importing main loads {', '.join(loaded)}")
+        failed = True
+
+    times = [run["ms"] for run in runs]
+    median = statistics.median(times)
+    color = "red" if median > budget else "green"
+    print(
+        f"[{color}]Import of main: median {median:.1f}ms, "
+        f"min {min(times):.1f}ms over {repeat} runs (budget {budget:g}ms)"
+    )
+    if median > budget or failed:
+        raise Exit(1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,99 @@
+"""Microbenchmarks of Url and ProbeTable: parsing urls, joining probe paths
+onto a target, and building the probe table of a target for a large scan,
+against the plain string concatenation the probes used before.
+
+    python -m bench.urls --components 20000
+"""
+
+import sys
+import time
+import timeit
+
+from rich import print
+from typer import Option, Typer
+from typing_extensions import Annotated
+
+from joom3y.components import database
+from joom3y.probes import ProbeTable, presence_probes
+from joom3y.url import Url
+
+app = Typer()
+
+URLS = (
+    "http://foo.bar/baz?qux=hex",
+    "https://www.example.com",
+    "https://example.com:8080/abc?param=value",
+    "http://localhost:3000/api/v1/users",
+    "https://sub.domain.example.com/some/path/",
+)
+TARGET = "https://www.example.com:8443/joomla"
+
+
+def components(count: int) -> list[str]:
+    """count component names, the database's followed by made-up ones."""
+    names = list(database())
+    names += [f"com_bench{i}" for i in range(count - len(names))]
+    return names[:count]
+
+
+def per_call(statement, number: int) -> float:
+    """The best time of one call over 5 repeats, in nanoseconds."""
+    return (
+        min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e9
+    )
+
+
+@app.command()
+def main(
+    components_count: Annotated[
+        int, Option("--components", "-c", help="Components in the table.")
+    ] = 10000,
+    number: Annotated[
+        int, Option("--number", "-n", help="Calls per timing of a call.")
+    ] = 100000,
+):
+    """Times Url.parse, Url joins and ProbeTable builds."""
+    for url in URLS:
+        print(
+            f"[blue]Url.parse({url!r}): "
+            f"{per_call(lambda: Url.parse(url), number):.0f}ns"
+        )
+
+    base = Url.parse(TARGET)
+    path = "/administrator/components/com_k2/"
+    print(f"[blue]Url join: {per_call(lambda: base + path, number):.0f}ns")
+    print(
+        f"[blue]str concatenation: "
+        f"{per_call(lambda: TARGET + path, number):.0f}ns"
+    )
+
+    names = components(components_count)
+    table = ProbeTable(TARGET)
+    start = time.perf_counter()
+    table.build(names)
+    first = time.perf_counter() - start
+    # The paths are shared between targets, the next ones only join them.
+    table = ProbeTable(TARGET)
+    start = time.perf_counter()
+    table.build(names)
+    next_ = time.perf_counter() - start
+    size = sum(sys.getsizeof(url) for url in table._urls.values())
+    print(
+        f"[blue]ProbeTable.build for {len(names)} components: "
+        f"{first * 1000:.1f}ms for the first target, "
+        f"{next_ * 1000:.1f}ms for the next, {len(table)} urls in "
+        f"{size / 1024:.0f} KiB"
+    )
+
+    paths = [probe[0] for name in names for probe in presence_probes(name)]
+    print(
+        f"[blue]Table lookup: "
+        f"{per_call(lambda: [table.url(p) for p in paths], 10) / len(paths):.0f}"
+        f"ns per url, concatenation: "
+        f"{per_call(lambda: [TARGET + p for p in paths], 10) / len(paths):.0f}"
+        f"ns per url"
+    )
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,638 @@
+"""The asyncio scan engine. It runs the same probes as the threaded engine in
+joom3y.joom3y, but as coroutines on one event loop, so the number of requests
+in flight is bounded by --limit rather than by a thread count."""
+
+import asyncio
+import time
+from contextlib import aclosing, asynccontextmanager, nullcontext
+
+import httpx
+from rich import print
+from rich.progress import track
+
+from joom3y import joom3y
+from joom3y.archive import Archive, RecordedError
+from joom3y.breaker import CircuitBreaker
+from joom3y.cache import CachedResponse, ResponseCache
+from joom3y.calibrate import Soft404
+from joom3y.controller import Controller
+from joom3y.joom3y import (
+    LISTED,
+    UNANSWERED,
+    enrichment,
+    listed_artifacts,
+    presence_probes,
+    report,
+    settle,
+)
+from joom3y.findings import FindingWriter
+from joom3y.journal import Journal
+from joom3y.listing import (
+    MAX_LISTING_BYTES,
+    Harvest,
+    Inventories,
+    Inventory,
+    ListingDetector,
+)
+from joom3y.metrics import Metrics
+from joom3y.priority import History, MissStreak
+from joom3y.probes import Plan, ProbeTable
+from joom3y.ratelimit import RateLimiter
+from joom3y.transport import EXISTS_BODY, PoolStats, content_length
+
+# The failures that count towards opening the circuit of a host.
+CONNECTION_ERRORS = (httpx.TimeoutException, httpx.NetworkError)
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """An httpx transport answering requests from a recorded scan, see
+    joom3y.archive."""
+
+    def __init__(self, archive: Archive):
+        self.archive = archive
+
+    async def handle_async_request(self, request: httpx.Request):
+        try:
+            status, headers, body = self.archive.replay(
+                request.method, str(request.url)
+            )
+        except RecordedError as e:
+            error = httpx.ConnectTimeout if e.timeout else httpx.ConnectError
+            raise error(f"Recorded: {e}", request=request)
+        return httpx.Response(status, headers=headers, content=body)
+
+
+def request_url(response: httpx.Response) -> str:
+    """The url of the request that led to a response, before redirects."""
+    first = response.history[0] if response.history else response
+    return str(first.request.url)
+
+
+class AsyncTransport:
+    """The asyncio counterpart of joom3y.transport.Transport. A semaphore caps
+    the requests in flight and the client pool is sized to match, so queued
+    probes wait on the semaphore instead of timing out on the pool. With
+    http2, targets that negotiate h2 over TLS get the requests multiplexed
+    on a few connections, a new one only when the open ones run out of
+    streams, and the others are spoken to over HTTP/1.1 as before.
+
+    Args:
+        url (str): The base url of the target, without a trailing slash.
+        user_agent (str): The User-Agent header sent with every request.
+        timeout (int): The per-request timeout, in seconds.
+        limit (int): The maximum number of requests in flight.
+        soft404 (Soft404 | None): The target's calibrated soft-404 signature.
+        cache (ResponseCache | None): The scan's response cache.
+        controller (Controller | None): The adaptive limit on requests in
+            flight, below the --limit ceiling.
+        limiter (RateLimiter | None): The scan's per-host and per-IP rate
+            limits.
+        breaker (CircuitBreaker | None): The circuit of the target's host.
+        journal (Journal | None): The scan's journal.
+        findings (FindingWriter | None): The writer of the scan's findings.
+        metrics (Metrics | None): The scan's metrics.
+        archive (Archive | None): The archive the scan records its traffic
+            to, or replays it from.
+        plan (Plan | None): The scan's enrichment probes.
+        head_probes (bool): Whether the target answers existence probes
+            with HEAD, see joom3y.calibrate.supports_head.
+        case_insensitive (bool): Whether the target resolves paths
+            case-insensitively, see joom3y.calibrate.case_insensitive.
+        http2 (bool): Whether to offer HTTP/2. It needs the h2 package.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        user_agent: str,
+        timeout: int = 5,
+        limit: int = 1000,
+        soft404: Soft404 | None = None,
+        cache: ResponseCache | None = None,
+        controller: Controller | None = None,
+        limiter: RateLimiter | None = None,
+        breaker: CircuitBreaker | None = None,
+        journal: Journal | None = None,
+        findings: FindingWriter | None = None,
+        metrics: Metrics | None = None,
+        archive: Archive | None = None,
+        plan: Plan | None = None,
+        head_probes: bool = False,
+        case_insensitive: bool = False,
+        http2: bool = False,
+    ):
+        self.url = url
+        self.soft404 = soft404
+        self.controller = controller
+        self.limiter = limiter
+
+        self.probes = ProbeTable(url)
+        parsed = self.probes.base
+        self.host = parsed.host
+        self.port = parsed.port or (443 if parsed.scheme == "https://" else 80)
+        self.breaker = breaker if breaker is not None else CircuitBreaker(url)
+        self.journal = journal if journal is not None else Journal()
+        self.findings = findings
+        self.plan = plan if plan is not None else Plan()
+        self.head_probes = head_probes
+        self.case_insensitive = case_insensitive
+        self.inventories = Inventories()
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.cache = cache if cache is not None else ResponseCache()
+        self.recording = archive if archive and not archive.replaying else None
+        self.stats = PoolStats()
+        self.metrics.pools.append(self.stats)
+        self._inflight = asyncio.Semaphore(limit)
+        self._client_options = dict(
+            headers={"User-Agent": user_agent},
+            timeout=timeout,
+            event_hooks={"request": [self._trace]},
+            limits=httpx.Limits(
+                max_connections=limit, max_keepalive_connections=limit
+            ),
+            transport=(
+                ReplayTransport(archive)
+                if archive is not None and archive.replaying
+                else None
+            ),
+        )
+        self.http2 = http2 and not (archive and archive.replaying)
+        self.client = httpx.AsyncClient(
+            http2=self.http2, **self._client_options
+        )
+
+    async def negotiate(self):
+        """Settles the protocol with one request before the probes start.
+        Until a connection has negotiated it, the pool takes every new one
+        for an HTTP/2 connection and queues requests on it, so against an
+        HTTP/1.1 server they would go out one connection at a time. A
+        target that doesn't answer over HTTP/2 gets an HTTP/1.1 client."""
+        if not self.http2:
+            return
+        try:
+            response = await self._send("HEAD", self.probes.url("/"))
+        except httpx.HTTPError:
+            return
+        if response.http_version != "HTTP/2":
+            self.http2 = False
+            await self.client.aclose()
+            self.client = httpx.AsyncClient(**self._client_options)
+
+    async def _trace(self, request: httpx.Request):
+        """Counts the connections requests open or reuse, from the events
+        httpcore traces while sending them."""
+        connected = False
+
+        async def trace(event: str, _):
+            nonlocal connected
+            if event == "connection.connect_tcp.complete":
+                connected = True
+            elif event.endswith(".send_request_headers.started"):
+                self.stats.record(not connected)
+
+        request.extensions["trace"] = trace
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.client.aclose()
+
+    async def request(
+        self, method: str, path: str = "/", need_body: bool = False
+    ) -> CachedResponse:
+        url = self.probes.url(path)
+        return await self.cache.fetch_async(
+            method, url, lambda: self._send(method, url), need_body
+        )
+
+    async def _send(self, method: str, url: str) -> httpx.Response:
+        async with self._slot():
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(
+                    method, url, follow_redirects=True
+                )
+            except BaseException as e:
+                self._record(start, e, method.lower())
+                self._record_error(method, url, e)
+                raise
+            self._record(start, response, method.lower())
+        self._record_response(method, response, response.content)
+        return response
+
+    @asynccontextmanager
+    async def _slot(self):
+        """Waits for a request's turn, and asks the breaker for it once it
+        has one, so a request cancelled while it waits for the semaphore
+        was never allowed and can't leave a recheck without its outcome.
+        The body must report the outcome with _record."""
+        async with self._inflight:
+            async with (
+                self.controller.aslot() if self.controller else nullcontext()
+            ):
+                self.breaker.allow()
+                try:
+                    if self.limiter is not None:
+                        delay = self.limiter.reserve(self.host, self.port)
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                except BaseException as e:
+                    self.breaker.failure(e, False)
+                    raise
+                yield
+
+    def _record(self, start: float, outcome, kind: str, streamed=False):
+        """Reports a response, or the exception a request raised, to the
+        breaker, the controller and the metrics. The body of a streamed
+        response is counted by its reader."""
+        latency = time.perf_counter() - start
+        if isinstance(outcome, BaseException):
+            self.breaker.failure(
+                outcome, isinstance(outcome, CONNECTION_ERRORS)
+            )
+            if not isinstance(outcome, Exception):
+                # Cancelled, which says nothing about the target.
+                return
+            timeout = isinstance(outcome, httpx.TimeoutException)
+            self.metrics.record(kind, latency, timeout=timeout)
+            if self.controller is not None:
+                self.controller.record(latency, timeout=timeout)
+            return
+
+        self.breaker.success()
+        self.metrics.record(
+            kind,
+            latency,
+            outcome.status_code,
+            0 if streamed else len(outcome.content),
+            protocol=outcome.http_version,
+        )
+        if self.controller is not None:
+            self.controller.record(
+                latency,
+                outcome.status_code,
+                outcome.headers.get("Retry-After"),
+            )
+
+    async def exists(self, path: str = "/") -> CachedResponse:
+        """The asyncio counterpart of Transport.exists."""
+        url = self.probes.url(path)
+        if self.head_probes:
+            return await self.cache.fetch_async(
+                "HEAD", url, lambda: self._exists_head(url)
+            )
+        return await self.cache.fetch_async(
+            "GET", url, lambda: self._exists_get(url)
+        )
+
+    async def _exists_head(self, url: str) -> httpx.Response:
+        response = await self._send("HEAD", url)
+        self.metrics.add_saved(content_length(response.headers))
+        return response
+
+    async def _exists_get(self, url: str) -> CachedResponse:
+        async with self._slot():
+            start = time.perf_counter()
+            response = None
+            try:
+                async with self.client.stream(
+                    "GET", url, follow_redirects=True
+                ) as response:
+                    self._record(start, response, "get", streamed=True)
+                    chunks = []
+                    read = 0
+                    async for chunk in response.aiter_bytes(EXISTS_BODY):
+                        chunks.append(chunk)
+                        read += len(chunk)
+                        if read > EXISTS_BODY:
+                            break
+            except BaseException as e:
+                if response is None:
+                    self._record(start, e, "get")
+                    self._record_error("GET", url, e)
+                raise
+
+        complete = read <= EXISTS_BODY
+        self.metrics.add_received(read)
+        if not complete:
+            self.metrics.add_saved(
+                max(content_length(response.headers) - read, 0)
+            )
+        body = b"".join(chunks)
+        self._record_response("GET", response, body, partial=not complete)
+        return CachedResponse(
+            response.status_code,
+            response.headers,
+            body if complete else None,
+            bool(response.history),
+        )
+
+    def _record_response(self, method, response, body, partial=False):
+        if self.recording:
+            self.recording.record(
+                method,
+                request_url(response),
+                response.status_code,
+                response.headers,
+                body,
+                redirected=bool(response.history),
+                partial=partial,
+            )
+
+    def _record_error(self, method: str, url: str, error: BaseException):
+        if self.recording and isinstance(error, CONNECTION_ERRORS):
+            self.recording.record_error(
+                method,
+                str(httpx.URL(url)),
+                isinstance(error, httpx.TimeoutException),
+            )
+
+    async def stream(self, path: str = "/", chunk_size: int = 1024):
+        """The asyncio counterpart of Transport.stream, wrap it in
+        contextlib.aclosing."""
+        url = self.probes.url(path)
+        entry = self.cache.lookup("GET", url)
+        if entry is not None:
+            yield entry.content
+            return
+
+        async with self._slot():
+            start = time.perf_counter()
+            response = None
+            try:
+                async with self.client.stream(
+                    "GET", url, follow_redirects=True
+                ) as response:
+                    self._record(start, response, "stream", streamed=True)
+                    chunks = []
+                    complete = False
+                    try:
+                        async for chunk in response.aiter_bytes(chunk_size):
+                            self.metrics.add_received(len(chunk))
+                            if self.recording:
+                                chunks.append(chunk)
+                            yield chunk
+                        complete = True
+                    finally:
+                        if self.recording:
+                            self.recording.record(
+                                "GET",
+                                request_url(response),
+                                response.status_code,
+                                response.headers,
+                                b"".join(chunks),
+                                redirected=bool(response.history),
+                                partial=not complete,
+                            )
+            except BaseException as e:
+                if response is None:
+                    self._record(start, e, "stream")
+                raise
+
+    async def get(
+        self, path: str = "/", need_body: bool = False
+    ) -> CachedResponse:
+        return await self.request("GET", path, need_body)
+
+    async def head(self, path: str = "/") -> CachedResponse:
+        return await self.request("HEAD", path)
+
+
+async def check_url(transport: AsyncTransport, path: str = "/"):
+    status = transport.journal.outcome(transport.url, path)
+    if status is not None:
+        return status
+
+    try:
+        if transport.soft404 and transport.soft404.signed(path):
+            conn = await transport.get(path, need_body=True)
+            status = conn.status_code
+            if transport.soft404.matches(path, status, conn.content):
+                status = 404
+        else:
+            status = (await transport.exists(path)).status_code
+    except Exception:
+        # Counted by the transport's breaker and reported in the summary.
+        return None
+
+    transport.journal.probe(transport.url, path, status)
+    return status
+
+
+async def get_content_length(transport: AsyncTransport, path: str = "/"):
+    try:
+        conn = await transport.head(path)
+        return int(conn.headers["content-length"])
+    except Exception:
+        return -1
+
+
+async def read_listing(transport: AsyncTransport, path: str) -> bytes | None:
+    detector = ListingDetector()
+    verdict = None
+    body = bytearray()
+    try:
+        async with aclosing(transport.stream(path)) as chunks:
+            async for chunk in chunks:
+                body += chunk
+                if verdict is None:
+                    verdict = detector.feed(chunk)
+                    if verdict is False:
+                        return None
+                if len(body) > MAX_LISTING_BYTES:
+                    break
+    except Exception:
+        return None
+    if verdict is None and not detector.close():
+        return None
+    return bytes(body)
+
+
+async def harvest(
+    transport: AsyncTransport, directory: str
+) -> Inventory | None:
+    body = await read_listing(transport, directory)
+    if body is None:
+        return None
+    tree = Harvest(directory, body, transport.probes.url)
+    while (subdirectory := tree.next()) is not None:
+        tree.add(await read_listing(transport, subdirectory))
+    return tree.inventory()
+
+
+async def inventory(
+    transport: AsyncTransport, directory: str
+) -> Inventory | None:
+    return await transport.inventories.get_async(
+        directory, lambda: harvest(transport, directory)
+    )
+
+
+async def listed(transport: AsyncTransport, root: str | None, path: str):
+    if root is None:
+        return None
+    tree = await inventory(transport, root)
+    if tree is None or not tree.covers(path):
+        return None
+    transport.metrics.add_listed()
+    return tree.has(path, transport.case_insensitive)
+
+
+async def check_file(transport, component, path, kind, root=None):
+    start = time.perf_counter()
+    found = await listed(transport, root, path)
+    if found:
+        report(transport, kind, path, component, None, start, LISTED)
+    elif found is None and await check_url(transport, path) == 200:
+        report(transport, kind, path, component, 200, start)
+
+
+async def check_index_file(transport, component, path, root=None):
+    start = time.perf_counter()
+    found = await listed(transport, root, path)
+    if found is None:
+        found = await check_url(transport, path) == 200
+    if found and await get_content_length(transport, path) > 1000:
+        report(transport, "index", path, component, 200, start)
+
+
+async def check_listing(transport, component, path, names=None):
+    start = time.perf_counter()
+    tree = await inventory(transport, path)
+    if tree is None:
+        return
+    report(
+        transport,
+        "listing",
+        path,
+        component,
+        None,
+        start,
+        f"{len(tree.files)} files",
+        tree.size,
+    )
+    for kind, file in listed_artifacts(tree, path, names or {}):
+        report(transport, kind, file, component, None, start, LISTED)
+
+
+CHECKS = {
+    joom3y.check_file: check_file,
+    joom3y.check_index_file: check_index_file,
+    joom3y.check_listing: check_listing,
+}
+
+
+async def presence(transport: AsyncTransport, component: str):
+    start = time.perf_counter()
+    failed = False
+    for path, note, listings in presence_probes(component):
+        status = await check_url(transport, path)
+        if status == 200:
+            report(transport, "component", path, component, 200, start, note)
+            return note, listings
+        failed = failed or status is None
+    return UNANSWERED if failed else None
+
+
+async def enrich(transport: AsyncTransport, component: str, note, listings):
+    # The enrichment probes of a found component run concurrently.
+    await asyncio.gather(
+        *(
+            CHECKS[check](transport, *args)
+            for check, args in enrichment(transport, component, listings)
+        )
+    )
+
+
+async def scanner(transport: AsyncTransport, component: str):
+    found = await presence(transport, component)
+    if found is not None and found is not UNANSWERED:
+        await enrich(transport, component, *found)
+
+
+async def scan_async(
+    url: str,
+    user_agent: str,
+    components,
+    timeout: int = 5,
+    limit: int = 1000,
+    soft404: Soft404 | None = None,
+    cache: ResponseCache | None = None,
+    history: History | None = None,
+    stop_after_misses: int | None = None,
+    controller: Controller | None = None,
+    limiter: RateLimiter | None = None,
+    breaker: CircuitBreaker | None = None,
+    journal: Journal | None = None,
+    findings: FindingWriter | None = None,
+    metrics: Metrics | None = None,
+    archive: Archive | None = None,
+    plan: Plan | None = None,
+    head_probes: bool = False,
+    case_insensitive: bool = False,
+    http2: bool = False,
+):
+    if history is None:
+        history = History()
+    if journal is None:
+        journal = Journal()
+    streak = MissStreak(stop_after_misses)
+    # Components still in their presence probes, the ones dropped on a stop.
+    probing = set()
+
+    async def scan_one(component: str):
+        task = asyncio.current_task()
+        probing.add(task)
+        try:
+            found = await presence(transport, component)
+        except asyncio.CancelledError:
+            # Dropped by a stop, which already took it out of probing. Any
+            # other cancellation, like a Ctrl-C, goes on up.
+            if task not in probing:
+                return
+            raise
+        probing.discard(task)
+
+        hit = settle(transport, history, journal, component, found)
+        if hit is None:
+            return
+        if streak.record(hit) and probing:
+            print(
+                f"[yellow]Stopping after {streak.misses} misses in a row, "
+                f"{len(probing)} components skipped"
+            )
+            for pending in probing:
+                pending.cancel()
+            probing.clear()
+        if hit:
+            await enrich(transport, component, *found)
+            journal.complete(url, component, True)
+
+    async with AsyncTransport(
+        url,
+        user_agent,
+        timeout,
+        limit,
+        soft404,
+        cache,
+        controller,
+        limiter,
+        breaker,
+        journal,
+        findings,
+        metrics,
+        archive,
+        plan,
+        head_probes,
+        case_insensitive,
+        http2,
+    ) as transport:
+        transport.probes.build(components)
+        await transport.negotiate()
+        tasks = [
+            asyncio.ensure_future(scan_one(component))
+            for component in components
+        ]
+        for future in track(asyncio.as_completed(tasks), total=len(tasks)):
+            await future
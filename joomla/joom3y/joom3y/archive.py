@@ -0,0 +1,205 @@
+"""Recorded scans. --record DIR stores every request a scan sends and its
+response, and --replay DIR answers the requests of a later scan from those
+records without touching the network, so detection changes can be rerun
+against a site in seconds. An archive is a directory of four files:
+
+    meta.json     the seed of the scan's random calibration paths
+    bodies.bin    the response bodies, back to back, each capped at MAX_BODY
+    headers.jsonl the distinct sets of response headers, one per line
+    index.tsv     one request per line, tab-separated:
+
+        method  url  status  flags  offset  length  headers line
+
+The flags mark a response reached through redirects (r), the body a listing
+check streamed before it stopped reading (p), a capped body (t), and a
+request that timed out (T) or failed to connect (E), stored with status 0.
+Bodies are stored decoded, without the headers of their encoding on the
+wire. Requests missing from an archive are answered with an empty 404."""
+
+import json
+import os
+import secrets
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+from joom3y.cache import MAX_BODY
+
+# Added to the url a replayed redirect points to, so its second request is
+# answered with the final response.
+REDIRECT_MARKER = "joom3y-replayed-redirect"
+# The headers describing a body as it was sent, rather than as it is stored.
+WIRE_HEADERS = ("content-encoding", "transfer-encoding")
+
+
+def decoded(headers) -> list[tuple[str, str]]:
+    """The (name, value) headers of a decoded body. Its encoding is dropped,
+    or it would be decoded again on replay, and so is the Content-Length of
+    an encoded body, which counted the encoded bytes."""
+    headers = list(headers)
+    encoded = any(name.lower() == "content-encoding" for name, _ in headers)
+    return [
+        (name, value)
+        for name, value in headers
+        if name.lower() not in WIRE_HEADERS
+        and not (encoded and name.lower() == "content-length")
+    ]
+
+
+class Record(NamedTuple):
+    status: int
+    flags: str
+    offset: int
+    length: int
+    headers: int
+
+
+class RecordedError(Exception):
+    """A recorded request failure, raised as the HTTP library's own error by
+    the replay adapters."""
+
+    def __init__(self, timeout: bool):
+        super().__init__("timed out" if timeout else "failed to connect")
+        self.timeout = timeout
+
+
+class Archive:
+    """A recorded scan, written to with --record and read with --replay.
+
+    Args:
+        path (Path): The archive directory.
+        replay (bool): Whether to read an existing archive, rather than
+            start a new one.
+    """
+
+    def __init__(self, path: Path, replay: bool = False):
+        self.path = path
+        self.replaying = replay
+        # The requests recorded or replayed, and those missing on a replay.
+        self.requests = 0
+        self.missed = 0
+        self.records: dict[tuple[str, str], Record] = {}
+        self._lock = threading.Lock()
+
+        if replay:
+            self.seed = json.loads((path / "meta.json").read_text())["seed"]
+            with open(path / "headers.jsonl") as f:
+                self.headers = [
+                    [tuple(header) for header in json.loads(line)]
+                    for line in f
+                ]
+            self._load()
+            self._bodies = os.open(path / "bodies.bin", os.O_RDONLY)
+            return
+
+        path.mkdir(parents=True, exist_ok=True)
+        self.seed = secrets.randbits(64)
+        (path / "meta.json").write_text(json.dumps({"seed": self.seed}) + "\n")
+        self._index = open(path / "index.tsv", "w")
+        self._body_file = open(path / "bodies.bin", "wb")
+        self._header_file = open(path / "headers.jsonl", "w")
+        self._header_sets: dict[str, int] = {}
+        self._offset = 0
+
+    def _load(self):
+        with open(self.path / "index.tsv") as f:
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                # A scan killed while recording can leave a torn last line.
+                if len(fields) != 7 or not fields[6].isdigit():
+                    continue
+                if int(fields[6]) >= len(self.headers):
+                    continue
+                method, url, status, flags, offset, length, headers = fields
+                key = (method, url)
+                # A streamed prefix never replaces a full response.
+                if "p" in flags and key in self.records:
+                    continue
+                self.records[key] = Record(
+                    int(status), flags, int(offset), int(length), int(headers)
+                )
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        headers,
+        body: bytes = b"",
+        redirected: bool = False,
+        partial: bool = False,
+    ):
+        flags = "r" * redirected + "p" * partial
+        if len(body) > MAX_BODY:
+            body = body[:MAX_BODY]
+            flags += "t"
+        self._append(
+            method, url, status, flags, body, decoded(headers.items())
+        )
+
+    def record_error(self, method: str, url: str, timeout: bool):
+        self._append(method, url, 0, "T" if timeout else "E", b"", [])
+
+    def _append(self, method, url, status, flags, body, headers):
+        headers = json.dumps(headers)
+        with self._lock:
+            number = self._header_sets.get(headers)
+            if number is None:
+                number = self._header_sets[headers] = len(self._header_sets)
+                self._header_file.write(headers + "\n")
+            self._body_file.write(body)
+            self._index.write(
+                f"{method}\t{url}\t{status}\t{flags}\t{self._offset}\t"
+                f"{len(body)}\t{number}\n"
+            )
+            self._offset += len(body)
+            self.requests += 1
+
+    def replay(
+        self, method: str, url: str
+    ) -> tuple[int, list[tuple[str, str]], bytes]:
+        """Returns the status, headers and body recorded for a request, or
+        raises RecordedError when it failed. A redirected response is
+        answered with a redirect to the marked url first."""
+        if REDIRECT_MARKER in url:
+            url = url.replace("&" + REDIRECT_MARKER, "").replace(
+                "?" + REDIRECT_MARKER, ""
+            )
+            redirect = False
+        else:
+            redirect = True
+
+        record = self.records.get((method, url))
+        with self._lock:
+            # The second half of a replayed redirect is the same request.
+            self.requests += redirect
+            if record is None:
+                self.missed += 1
+        if record is None:
+            return 404, [("Content-Length", "0")], b""
+        if "T" in record.flags or "E" in record.flags:
+            raise RecordedError("T" in record.flags)
+        if redirect and "r" in record.flags:
+            location = url + ("&" if "?" in url else "?") + REDIRECT_MARKER
+            return 302, [("Location", location), ("Content-Length", "0")], b""
+
+        body = os.pread(self._bodies, record.length, record.offset)
+        # Archives recorded before bodies were stored decoded kept them all.
+        return record.status, decoded(self.headers[record.headers]), body
+
+    def summary(self) -> str:
+        if not self.replaying:
+            return f"{self.requests} requests recorded to {self.path}"
+        return (
+            f"{self.requests} requests replayed from {self.path}, "
+            f"{self.missed} of them not in the archive and answered 404"
+        )
+
+    def close(self):
+        if self.replaying:
+            os.close(self._bodies)
+            return
+        with self._lock:
+            self._index.close()
+            self._body_file.close()
+            self._header_file.close()
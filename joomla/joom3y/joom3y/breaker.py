@@ -0,0 +1,123 @@
+"""A circuit breaker per host. After a number of connection failures or
+timeouts in a row the circuit opens, and requests to the host fail at once
+with CircuitOpen instead of each waiting out its timeout. Once a cooldown has
+passed a single request is let through to recheck the host (half-open): an
+answer closes the circuit, another failure opens it again for twice as long.
+Errors are counted by type, to be reported once at the end of the scan
+instead of one line per failed probe."""
+
+import threading
+import time
+from collections import Counter
+
+from rich import print
+
+COOLDOWN = 5.0
+MAX_COOLDOWN = 120.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class CircuitBreaker:
+    """The circuit of one host, shared by every transport to it.
+
+    Args:
+        host (str): The host, used in messages.
+        threshold (int): The connection failures or timeouts in a row that
+            open the circuit.
+        cooldown (float): The seconds before an open circuit is rechecked.
+    """
+
+    def __init__(
+        self, host: str, threshold: int = 5, cooldown: float = COOLDOWN
+    ):
+        self.host = host
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self.errors: Counter[str] = Counter()
+
+        self._retry_at = 0.0
+        self._backoff = cooldown
+        self._lock = threading.Lock()
+
+    @property
+    def closed(self) -> bool:
+        return self.state == CLOSED
+
+    def allow(self):
+        """Raises CircuitOpen when a request may not be sent now. Every
+        allowed request must be followed by success() or failure()."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and time.monotonic() >= self._retry_at:
+                # Let this request through as the recheck, and hold the
+                # others back until it's done.
+                self.state = HALF_OPEN
+                return
+            self.rejected += 1
+        raise CircuitOpen(f"circuit open for {self.host}")
+
+    def success(self):
+        """Records that the host answered. Only the recheck closes an open
+        circuit, not requests that were already in flight when it opened."""
+        with self._lock:
+            self.failures = 0
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self._backoff = self.cooldown
+                print(f"[green]{self.host} answers again, circuit closed")
+
+    def failure(self, error: BaseException, connection: bool):
+        """Records a failed request. connection is whether it failed to
+        connect or timed out, the failures that open the circuit; other
+        errors are only counted."""
+        with self._lock:
+            if isinstance(error, Exception):
+                self.errors[type(error).__name__] += 1
+            if self.state == HALF_OPEN:
+                if connection:
+                    self._backoff = min(self._backoff * 2, MAX_COOLDOWN)
+                self._open()
+                return
+            if not connection:
+                return
+
+            self.failures += 1
+            if self.state == CLOSED and self.failures >= self.threshold:
+                self.opened += 1
+                self._open()
+                print(
+                    f"[red]{self.host} failed {self.failures} times in a row "
+                    f"({type(error).__name__}), circuit open"
+                )
+
+    def _open(self):
+        self.state = OPEN
+        self._retry_at = time.monotonic() + self._backoff
+
+    def summary(self) -> str | None:
+        """The aggregated errors, or None when there were none."""
+        if not self.errors and not self.rejected:
+            return None
+        errors = ", ".join(
+            f"{count} {name}" for name, count in self.errors.most_common()
+        )
+        summary = errors or "none"
+        if self.opened:
+            times = "once" if self.opened == 1 else f"{self.opened} times"
+            summary += (
+                f"; circuit opened {times}, "
+                f"{self.rejected} requests failed fast"
+            )
+        return summary
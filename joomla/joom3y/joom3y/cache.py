@@ -0,0 +1,229 @@
+"""A scan-scoped response cache. Several probes hit the same url (the presence
+probe and the listing check of a component directory, the GET and HEAD of an
+index file, the version paths), so responses are kept by method and url, and
+callers asking for a url that is already being fetched wait for that request
+instead of sending their own."""
+
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import asyncio
+
+# Bodies larger than this are not kept, only their status and headers.
+MAX_BODY = 64 * 1024
+# The total size of the bodies kept by one cache.
+MAX_BYTES = 32 * 1024 * 1024
+# The responses kept by one cache, the oldest are dropped first. Repeated
+# probes of a url come close together, around one component's probes.
+MAX_ENTRIES = 4096
+
+
+class CachedResponse:
+    """The parts of a response the probes use. content is None when the body
+    was too large to keep, or was never downloaded."""
+
+    __slots__ = ("status_code", "headers", "content", "redirected")
+
+    def __init__(self, status_code, headers, content, redirected):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.redirected = redirected
+
+    @property
+    def text(self) -> str:
+        return (self.content or b"").decode("utf-8", "replace")
+
+    @classmethod
+    def from_response(cls, response, keep_body: bool = True):
+        """Builds an entry from a requests or httpx response."""
+        return cls(
+            response.status_code,
+            response.headers,
+            response.content if keep_body else None,
+            bool(response.history),
+        )
+
+
+class ResponseCache:
+    """Responses of one scan keyed by (method, url), with in-flight requests
+    shared between concurrent callers. A HEAD is answered from a cached GET
+    of the same url when that GET was not redirected.
+
+    Args:
+        max_body (int): The largest body kept, in bytes.
+        max_bytes (int): The total size of the bodies kept, in bytes.
+        max_entries (int): The number of responses kept.
+    """
+
+    def __init__(
+        self,
+        max_body: int = MAX_BODY,
+        max_bytes: int = MAX_BYTES,
+        max_entries: int = MAX_ENTRIES,
+    ):
+        self.max_body = max_body
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.stored_bytes = 0
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], CachedResponse] = {}
+        self._inflight: dict[tuple[str, str], "Future | asyncio.Future"] = {}
+
+    @property
+    def saved(self) -> int:
+        """The number of requests the cache answered without sending."""
+        return self.hits + self.coalesced
+
+    def _lookup(self, method: str, url: str, need_body: bool):
+        entry = self._entries.get((method, url))
+        if entry is None and method == "HEAD":
+            entry = self._entries.get(("GET", url))
+            if entry is not None and entry.redirected:
+                entry = None
+        if entry is not None and need_body and entry.content is None:
+            return None
+        return entry
+
+    def lookup(self, method: str, url: str) -> CachedResponse | None:
+        """Returns the cached response for url with its body, if there is
+        one, without fetching anything."""
+        with self._lock:
+            entry = self._lookup(method, url, need_body=True)
+            if entry is not None:
+                self.hits += 1
+            return entry
+
+    def peek(self, method: str, url: str) -> CachedResponse | None:
+        """Returns the cached response for url, with or without its body,
+        without counting it as a hit."""
+        with self._lock:
+            return self._lookup(method, url, need_body=False)
+
+    def _store(self, key, response) -> CachedResponse:
+        # Existence probes hand over an entry of their own, without a body
+        # when they didn't read it.
+        content = response.content
+        keep = (
+            content is not None
+            and len(content) <= self.max_body
+            and self.stored_bytes + len(content) <= self.max_bytes
+        )
+        if keep:
+            self.stored_bytes += len(content)
+        if isinstance(response, CachedResponse):
+            entry = response
+            if not keep:
+                entry.content = None
+        else:
+            entry = CachedResponse.from_response(response, keep)
+        if key in self._entries:
+            self._evict(key)
+        while len(self._entries) >= self.max_entries:
+            self._evict(next(iter(self._entries)))
+        self._entries[key] = entry
+        return entry
+
+    def _evict(self, key):
+        entry = self._entries.pop(key)
+        if entry.content is not None:
+            self.stored_bytes -= len(entry.content)
+
+    def clear(self):
+        """Drops every response, once the target's scan is over."""
+        with self._lock:
+            self._entries.clear()
+            self.stored_bytes = 0
+
+    def fetch(
+        self, method: str, url: str, send, need_body: bool = False
+    ) -> CachedResponse:
+        """Returns the cached response for url, or calls send() to fetch it.
+        When another thread is already fetching url this waits for its
+        result instead."""
+        key = (method, url)
+        with self._lock:
+            entry = self._lookup(method, url, need_body)
+            if entry is not None:
+                self.hits += 1
+                return entry
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                self._inflight[key] = owned = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if pending is not None:
+            entry = pending.result()
+            if need_body and entry.content is None:
+                return CachedResponse.from_response(send())
+            return entry
+
+        try:
+            response = send()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            owned.set_exception(e)
+            raise
+
+        with self._lock:
+            entry = self._store(key, response)
+            del self._inflight[key]
+        owned.set_result(entry)
+        if need_body and entry.content is None:
+            return CachedResponse.from_response(response)
+        return entry
+
+    async def fetch_async(
+        self, method: str, url: str, send, need_body: bool = False
+    ) -> CachedResponse:
+        """The asyncio counterpart of fetch, send is a coroutine function."""
+        import asyncio
+
+        key = (method, url)
+        with self._lock:
+            entry = self._lookup(method, url, need_body)
+            if entry is not None:
+                self.hits += 1
+                return entry
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                self._inflight[key] = owned = (
+                    asyncio.get_running_loop().create_future()
+                )
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if pending is not None:
+            entry = await pending
+            if need_body and entry.content is None:
+                return CachedResponse.from_response(await send())
+            return entry
+
+        try:
+            response = await send()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            owned.set_exception(e)
+            # Nobody may be waiting on it, don't warn about it.
+            owned.exception()
+            raise
+
+        with self._lock:
+            entry = self._store(key, response)
+            del self._inflight[key]
+        owned.set_result(entry)
+        if need_body and entry.content is None:
+            return CachedResponse.from_response(response)
+        return entry
@@ -0,0 +1,182 @@
+"""Soft-404 calibration. Some sites answer unknown options and paths with a
+200 page instead of a 404, which makes every component look installed. Before
+the component scans we fetch a few random names that cannot exist, remember
+what those answers look like, and treat probe responses that look the same
+as not found. The target's answers to HEAD are checked the same way, to
+tell whether existence probes can do without bodies, and its answers to a
+known file in the other case, to tell whether probes that differ only by
+case can be sent once."""
+
+import hashlib
+import random
+import re
+import secrets
+
+from rich import print
+from rich.markup import escape
+
+SAMPLES = 2
+# How far outside the calibrated length range an unstable page may drift.
+LENGTH_SLACK = 32
+
+
+def probe_kind(path: str) -> str:
+    if "?option=" in path:
+        return "option"
+    if path.endswith("/"):
+        return "directory"
+    return "file"
+
+
+def normalize(path: str, body: bytes) -> bytes:
+    """Removes the parts of the path from the body, as catch-all pages often
+    echo the requested option or path back."""
+    for token in re.split(r"[/?=&]", path):
+        if len(token) > 3:
+            body = body.replace(token.encode(), b"")
+    return body
+
+
+class Signature:
+    """What a catch-all answer for one kind of probe looks like. When every
+    sample hashed the same the page is static and must match exactly,
+    otherwise it has dynamic parts and matches on length."""
+
+    def __init__(self, status: int):
+        self.status = status
+        self.hashes: set[bytes] = set()
+        self.min_length: int | None = None
+        self.max_length: int | None = None
+
+    def add(self, body: bytes):
+        self.hashes.add(hashlib.sha1(body).digest())
+        length = len(body)
+        if self.min_length is None or length < self.min_length:
+            self.min_length = length
+        if self.max_length is None or length > self.max_length:
+            self.max_length = length
+
+    def matches(self, status: int, body: bytes) -> bool:
+        if status != self.status:
+            return False
+        if len(self.hashes) == 1:
+            return hashlib.sha1(body).digest() in self.hashes
+        return (
+            self.min_length - LENGTH_SLACK
+            <= len(body)
+            <= self.max_length + LENGTH_SLACK
+        )
+
+
+class Soft404:
+    """The soft-404 signatures of one target, by kind of probe."""
+
+    def __init__(self):
+        self.signatures: dict[str, Signature] = {}
+
+    def __bool__(self):
+        return bool(self.signatures)
+
+    def signed(self, path: str) -> bool:
+        """Whether probes of path's kind have a signature, so only the body
+        of their answer tells whether it is the catch-all page."""
+        return probe_kind(path) in self.signatures
+
+    def matches(self, path: str, status: int, body: bytes | None) -> bool:
+        signature = self.signatures.get(probe_kind(path))
+        if signature is None or body is None:
+            return False
+        return signature.matches(status, normalize(path, body))
+
+
+def random_paths(kind: str, rng: random.Random) -> list[str]:
+    paths = []
+    for _ in range(SAMPLES):
+        component = "com_" + rng.randbytes(6).hex()
+        if kind == "option":
+            paths.append("/index.php?option=" + component)
+        elif kind == "directory":
+            paths.append("/components/" + component + "/")
+        else:
+            paths.append(
+                "/components/"
+                + component
+                + "/"
+                + rng.randbytes(4).hex()
+                + ".txt"
+            )
+    return paths
+
+
+def calibrate(transport, seed: int | None = None) -> Soft404:
+    """Fetches random options, directories and files from the target and
+    records a signature for each kind that does not answer with an error.
+    A seed picks the same random names again, so a replayed scan finds them
+    in its archive."""
+    rng = random.Random(seed if seed is not None else secrets.randbits(64))
+    soft404 = Soft404()
+    for kind in ("option", "directory", "file"):
+        signature = None
+        for path in random_paths(kind, rng):
+            try:
+                page = transport.get(path, need_body=True)
+            except Exception:
+                signature = None
+                break
+
+            if page.status_code >= 400 or (
+                signature is not None and page.status_code != signature.status
+            ):
+                signature = None
+                break
+
+            if signature is None:
+                signature = Signature(page.status_code)
+            signature.add(normalize(path, page.content))
+
+        if signature is not None:
+            soft404.signatures[kind] = signature
+            print(
+                f"[yellow]Soft-404 detected for {kind} probes on {escape(transport.url)}, "
+                "matching responses are ignored"
+            )
+    return soft404
+
+
+def supports_head(transport, seed: int | None = None) -> bool:
+    """Whether the target answers HEAD like GET, with the same status for
+    the home page and for a random file that cannot exist, so existence
+    probes can skip bodies with HEADs. Servers that refuse HEAD (405, 501)
+    or answer it differently keep GETs. The HEADs go first, as the cache
+    would answer them from the GETs."""
+    rng = random.Random(seed if seed is not None else secrets.randbits(64))
+    missing = "/" + rng.randbytes(6).hex() + ".html"
+    try:
+        for path in ("/index.php", missing):
+            head = transport.head(path).status_code
+            if head != transport.get(path).status_code:
+                return False
+    except Exception:
+        return False
+    return True
+
+
+def case_insensitive(transport, known, seed: int | None = None) -> bool:
+    """Whether the target resolves paths case-insensitively, like IIS or
+    Apache with mod_speling, so that README.txt and readme.txt are the same
+    file. The first of the known paths that exists is asked for in swapped
+    case, and a random file of the same type that cannot exist must still be
+    missing, so a catch-all answer doesn't pass for a match."""
+    rng = random.Random(seed if seed is not None else secrets.randbits(64))
+    try:
+        for path in known:
+            if transport.exists(path).status_code != 200:
+                continue
+            if transport.exists(path.swapcase()).status_code != 200:
+                return False
+            suffix = path[path.rfind(".") :] if "." in path else ""
+            missing = "/" + rng.randbytes(6).hex() + suffix
+            return transport.exists(missing).status_code >= 400
+    except Exception:
+        return False
+    return False
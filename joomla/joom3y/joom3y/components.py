@@ -1,1237 +1,120 @@
-COMPONENTS = [
-    "com_5starhotels",
-    "com_a3000",
-    "com_a6mambocredits",
-    "com_a6mambohelpdesk",
-    "com_aardvertiser",
-    "com_ab",
-    "com_ab_gallery",
-    "com_abbrev",
-    "com_abc",
-    "com_abook",
-    "com_about",
-    "com_abstract",
-    "com_acajoom",
-    "com_acctexp",
-    "com_aceftp",
-    "com_aclassf",
-    "com_aclassfb",
-    "com_aclsfgpl",
-    "com_acmisc",
-    "com_acooldebate",
-    "com_acprojects",
-    "com_acstartseite",
-    "com_acteammember",
-    "com_actionlogs",
-    "com_actions",
-    "com_activities",
-    "com_actualite",
-    "com_acym",
-    "com_acymailing",
-    "com_acysms",
-    "com_acysms_express",
-    "com_adagency",
-    "com_addressbook",
-    "com_adds",
-    "com_admin",
-    "com_adsmanager",
-    "com_advancedpoll",
-    "com_advert",
-    "com_advertisementboard",
-    "com_advertising",
-    "com_affiliatetracker",
-    "com_agency",
-    "com_agenda",
-    "com_agora",
-    "com_agoragroup",
-    "com_aicontactsafe",
-    "com_aindexdictionaries",
-    "com_airmonoblock",
-    "com_aist",
-    "com_ajax",
-    "com_ajax-shoutbox",
-    "com_ajaxchat",
-    "com_ajaxquiz",
-    "com_akeeba",
-    "com_akobook",
-    "com_akocomment",
-    "com_akogallery",
-    "com_alameda",
-    "com_alberghi",
-    "com_album",
-    "com_alert",
-    "com_alfcontact",
-    "com_alfresco",
-    "com_alfurqan",
-    "com_alfurqan15x",
-    "com_allcinevid",
-    "com_allhotels",
-    "com_alphacontent",
-    "com_alphauserpoints",
-    "com_altas",
-    "com_altauserpoints",
-    "com_amblog",
-    "com_amgallery",
-    "com_aml_2",
-    "com_amocourse",
-    "com_annonces",
-    "com_annuaire",
-    "com_answers",
-    "com_appointinator",
-    "com_appointment",
-    "com_aprice",
-    "com_arcadegames",
-    "com_archeryscores",
-    "com_ariquiz",
-    "com_artforms",
-    "com_article",
-    "com_articleman",
-    "com_articlemanager",
-    "com_articles",
-    "com_artist",
-    "com_artlinks",
-    "com_artportal",
-    "com_as",
-    "com_asortyment",
-    "com_astatspro",
-    "com_auctionfactory",
-    "com_autartimonial",
-    "com_autartitarot",
-    "com_autostand",
-    "com_availcal",
-    "com_avosbillets",
-    "com_avreloaded",
-    "com_awd_song",
-    "com_awdwall",
-    "com_awesom",
-    "com_awiki",
-    "com_aysquiz",
-    "com_b2jcontact",
-    "com_b2portfolio",
-    "com_babackup",
-    "com_baforms",
-    "com_banners",
-    "com_bayesiannaivefilter",
-    "com_bazaar",
-    "com_bbs",
-    "com_bca-rss-syndicator",
-    "com_be",
-    "com_beamospetition",
-    "com_bearleague",
-    "com_beeheard",
-    "com_bfquiz_sqli",
-    "com_bfquiztrial",
-    "com_bfsurvey",
-    "com_bfsurvey_basic",
-    "com_bfsurvey_pro",
-    "com_bfsurvey_profree",
-    "com_biblestudy",
-    "com_biblioteca",
-    "com_bidding",
-    "com_biitatemplateshop",
-    "com_billyportfolio",
-    "com_biographies",
-    "com_bit",
-    "com_blog",
-    "com_blog_calendar",
-    "com_blogfactory",
-    "com_bnf",
-    "com_book",
-    "com_bookflip",
-    "com_bookjoomlas",
-    "com_booklibrary",
-    "com_booklibrary_1",
-    "com_bookmarks",
-    "com_bookpro",
-    "com_books",
-    "com_boss",
-    "com_br",
-    "com_breezingforms",
-    "com_brightweblinks",
-    "com_bsadv",
-    "com_bsq",
-    "com_bsqsitestats",
-    "com_bt_media",
-    "com_bulkenquery",
-    "com_business",
-    "com_buslicense",
-    "com_ca",
-    "com_caddy",
-    "com_calcbuilder",
-    "com_calendar",
-    "com_calendario",
-    "com_calendarplanner",
-    "com_camelcitydb2",
-    "com_camp",
-    "com_candle",
-    "com_canteen",
-    "com_caproductprices",
-    "com_car",
-    "com_carman",
-    "com_cartikads",
-    "com_cartweberp",
-    "com_casino",
-    "com_casino_blackjack",
-    "com_casinobase",
-    "com_catalog",
-    "com_catalogproduction",
-    "com_catalogshop",
-    "com_catalogue",
-    "com_category",
-    "com_catfiltering",
-    "com_cb",
-    "com_cbcontact",
-    "com_cbe",
-    "com_cbresumebuilder",
-    "com_ccboard",
-    "com_ccinvoices",
-    "com_ccnewsletter",
-    "com_cgtestimonial",
-    "com_checklist",
-    "com_chronoconnectivity",
-    "com_chronocontact",
-    "com_cinema",
-    "com_civicrm",
-    "com_cjlib",
-    "com_ckforms",
-    "com_clan",
-    "com_clan_members",
-    "com_clanlist",
-    "com_clantools",
-    "com_clasifier",
-    "com_classified",
-    "com_classifieds",
-    "com_clickheat",
-    "com_cloner",
-    "com_clubmanager",
-    "com_cmimarketplace",
-    "com_cmotour",
-    "com_cms",
-    "com_collectionfactory",
-    "com_collector",
-    "com_colophon",
-    "com_color",
-    "com_colorlab",
-    "com_commedia",
-    "com_comments",
-    "com_community",
-    "com_communitypolls",
-    "com_communityquiz",
-    "com_communitysurveys",
-    "com_comp",
-    "com_competitions",
-    "com_component",
-    "com_comprofiler",
-    "com_config",
-    "com_connect",
-    "com_contact",
-    "com_contact_enhanced",
-    "com_contactformmaker",
-    "com_contactinfo",
-    "com_content",
-    "com_contentbloglist",
-    "com_contenthistory",
-    "com_contentmap",
-    "com_controller",
-    "com_contushdvideoshare",
-    "com_convertforms",
-    "com_countries",
-    "com_coupon",
-    "com_cpeventcalendar",
-    "com_cpg",
-    "com_creativecontactform",
-    "com_crhotels",
-    "com_cropimage",
-    "com_crowdsource",
-    "com_custompages",
-    "com_cvmaker",
-    "com_cwtags",
-    "com_cx",
-    "com_d-greinar",
-    "com_d3000",
-    "com_dadamail",
-    "com_dailymeals",
-    "com_dailymessage",
-    "com_dashboard",
-    "com_datafeeds",
-    "com_dateconverter",
-    "com_datsogallery",
-    "com_dbquery",
-    "com_dcnews",
-    "com_dcs_flashgames",
-    "com_delicious",
-    "com_departments",
-    "com_detail",
-    "com_dhforum",
-    "com_diary",
-    "com_digifolio",
-    "com_digistore",
-    "com_dioneformwizard",
-    "com_directorix",
-    "com_directory",
-    "com_dirfrm",
-    "com_discussions",
-    "com_dj-classifieds",
-    "com_djartgallery",
-    "com_djcatalog",
-    "com_djclassifieds",
-    "com_djiceshoutbox",
-    "com_dm_orders",
-    "com_dms",
-    "com_doc",
-    "com_docman",
-    "com_docmanpaypal",
-    "com_donateprocess",
-    "com_doqment",
-    "com_downloads",
-    "com_drawroot",
-    "com_ds-syndicate",
-    "com_dshop",
-    "com_dt-register",
-    "com_dtracker",
-    "com_dtregister",
-    "com_dutchfactory",
-    "com_dv",
-    "com_dwgraphs",
-    "com_easy_youtube_gallery",
-    "com_easyblog",
-    "com_easybook",
-    "com_easydiscuss",
-    "com_easygb",
-    "com_easyshop",
-    "com_ecommercewd",
-    "com_econtent",
-    "com_education",
-    "com_education_classes",
-    "com_ekrishta",
-    "com_elite",
-    "com_elite_experts",
-    "com_emcomposer",
-    "com_emgallery",
-    "com_enmasse",
-    "com_ensenanzas",
-    "com_eportfolio",
-    "com_equipment",
-    "com_equotes",
-    "com_esearch",
-    "com_eshop",
-    "com_eslamiat",
-    "com_estateagent",
-    "com_event",
-    "com_eventbooking",
-    "com_eventcal",
-    "com_eventing",
-    "com_eventix",
-    "com_eventlist",
-    "com_events",
-    "com_ewriting",
-    "com_expautospro",
-    "com_expedition",
-    "com_expose",
-    "com_expose_small_rc4",
-    "com_expshop",
-    "com_extcalendar",
-    "com_extended",
-    "com_extplorer",
-    "com_extplorer-test1",
-    "com_extplorer-test2",
-    "com_extplorer-test3",
-    "com_extrasearch",
-    "com_extroform",
-    "com_ezautos",
-    "com_ezine",
-    "com_ezstore",
-    "com_fabrik",
-    "com_facebook",
-    "com_facegallery",
-    "com_facileforms",
-    "com_family",
-    "com_fantasytournament",
-    "com_faq",
-    "com_faqbook",
-    "com_fastball",
-    "com_fbb",
-    "com_feederator",
-    "com_fields",
-    "com_filebase",
-    "com_filiale",
-    "com_fireboard",
-    "com_firmy",
-    "com_flash",
-    "com_flashfun",
-    "com_flashgames",
-    "com_flashmagazinedeluxe",
-    "com_flexicontent",
-    "com_flippingbook",
-    "com_flipwall",
-    "com_flyspray",
-    "com_fm",
-    "com_focalpoint",
-    "com_foevpartners",
-    "com_foobla",
-    "com_foobla_suggestions",
-    "com_football",
-    "com_forme",
-    "com_formmaker",
-    "com_formtool",
-    "com_forum",
-    "com_foto",
-    "com_foxcontact",
-    "com_fq",
-    "com_freichat",
-    "com_frontenduseraccess",
-    "com_fss",
-    "com_full",
-    "com_fundraiser",
-    "com_furniture",
-    "com_g2bridge",
-    "com_gadgetfactory",
-    "com_galeria",
-    "com_galleria",
-    "com_gallery",
-    "com_gallery_wd",
-    "com_galleryxml",
-    "com_gambling",
-    "com_game",
-    "com_gameq",
-    "com_gamesbox",
-    "com_gameserver",
-    "com_ganalytics",
-    "com_gantry",
-    "com_garyscookbook",
-    "com_gbufacebook",
-    "com_gcalendar",
-    "com_gds",
-    "com_genealogy",
-    "com_geoboerse",
-    "com_geocontent",
-    "com_giftexchange",
-    "com_gigcal",
-    "com_gigfe",
-    "com_gk3_photoslide",
-    "com_gmap",
-    "com_gmapfp",
-    "com_gmaps",
-    "com_gnosis",
-    "com_golfcourseguid",
-    "com_golfcourseguide",
-    "com_google",
-    "com_googlebase",
-    "com_googlemaplocator",
-    "com_goverment",
-    "com_gpstools",
-    "com_graphics",
-    "com_grid",
-    "com_groovygallery",
-    "com_groupjive",
-    "com_groups",
-    "com_gsticketsystem",
-    "com_guesser",
-    "com_guide",
-    "com_guru",
-    "com_gurujibook",
-    "com_hashcash",
-    "com_hbooking",
-    "com_hbssearch",
-    "com_hdflvplayer",
-    "com_hdvideoshare",
-    "com_hdwplayer",
-    "com_healthstats",
-    "com_hello",
-    "com_hello_world",
-    "com_helpdeskpro",
-    "com_hezacontent",
-    "com_hikasho",
-    "com_hmcommunity",
-    "com_horoscope",
-    "com_horses",
-    "com_hospital",
-    "com_hotbrackets",
-    "com_hotel",
-    "com_hotelguide",
-    "com_hotproperties",
-    "com_hotproperty",
-    "com_hotspots",
-    "com_hsconfig",
-    "com_htmlarea3",
-    "com_huruhelpdesk",
-    "com_hwdvideoshare",
-    "com_icagenda",
-    "com_ice",
-    "com_idoblog",
-    "com_idvnews",
-    "com_if_nexus",
-    "com_if_surfalert",
-    "com_igallery",
-    "com_ignitegallery",
-    "com_iigcatalog",
-    "com_ijoomla",
-    "com_ijoomla_archive",
-    "com_ijoomla_rss",
-    "com_imagebrowser",
-    "com_img",
-    "com_imoti",
-    "com_include",
-    "com_informations",
-    "com_inneradmission",
-    "com_installer",
-    "com_inter",
-    "com_intranet",
-    "com_intuit",
-    "com_invitex",
-    "com_iomezun",
-    "com_ionfiles",
-    "com_iproperty",
-    "com_ircmbasic",
-    "com_is",
-    "com_itarmory",
-    "com_items",
-    "com_ixxocart",
-    "com_j-projects",
-    "com_j2store",
-    "com_jabode",
-    "com_jacomment",
-    "com_jajobboard",
-    "com_janews",
-    "com_jashowcase",
-    "com_javoice",
-    "com_jb2",
-    "com_jbcatalog",
-    "com_jbdiary",
-    "com_jbook",
-    "com_jbpeople",
-    "com_jbpublishdownfp",
-    "com_jbudgetsmagic",
-    "com_jbuildozer",
-    "com_jbusinessdirectory",
-    "com_jcafe",
-    "com_jcalpro",
-    "com_jcart",
-    "com_jce",
-    "com_jclassifiedsmanager",
-    "com_jcollection",
-    "com_jcomments",
-    "com_jcommunity",
-    "com_jcruisereservation",
-    "com_jcs",
-    "com_jd-wiki",
-    "com_jd-wp",
-    "com_jdbexport",
-    "com_jdirectory",
-    "com_jdownloads",
-    "com_jdrugstopics",
-    "com_jeajaxeventcalendar",
-    "com_jeauction",
-    "com_jeauto",
-    "com_jeawdsong",
-    "com_jeclassifieds",
-    "com_jeclassifyads",
-    "com_jedirectory",
-    "com_jeemaarticlecollection",
-    "com_jeemasms",
-    "com_jeeventcalendar",
-    "com_jefaqpro",
-    "com_jeformcr",
-    "com_jegallery",
-    "com_jegridfolio",
-    "com_jeguestbook",
-    "com_jejob",
-    "com_jek2storymultipleform",
-    "com_jem",
-    "com_jembedall",
-    "com_jemediaplayer",
-    "com_jemembership",
-    "com_jemessenger",
-    "com_jepaypervideo",
-    "com_jephotogallery",
-    "com_jepoll",
-    "com_jeportfolio",
-    "com_jepropertyfinder",
-    "com_jequestions",
-    "com_jequizmanagement",
-    "com_jequoteform",
-    "com_jereverseauction",
-    "com_jesectionfinder",
-    "com_jesubmit",
-    "com_jeticket",
-    "com_jetour",
-    "com_jeux",
-    "com_jevideogallery",
-    "com_jevideorate",
-    "com_jfbconnect",
-    "com_jfeedback",
-    "com_jfuploader",
-    "com_jfusion",
-    "com_jgen",
-    "com_jgive",
-    "com_jgrid",
-    "com_jhotelreservation",
-    "com_jifile",
-    "com_jigsaw",
-    "com_jim",
-    "com_jimtawl",
-    "com_jinc",
-    "com_jinventory",
-    "com_jjgallery",
-    "com_jlike",
-    "com_jlord_rss",
-    "com_jmarket",
-    "com_jmovies",
-    "com_jmsfileseller",
-    "com_jmsmusic",
-    "com_jnews",
-    "com_jnewsletter",
-    "com_jnewspaper",
-    "com_joaktree",
-    "com_job",
-    "com_jobads",
-    "com_jobgrokapp",
-    "com_jobgroklist",
-    "com_jobline",
-    "com_jobprofile",
-    "com_jobsfactory",
-    "com_jofacebookgallery",
-    "com_joltcard",
-    "com_jombib",
-    "com_jomcomdev",
-    "com_jomdirectory",
-    "com_jomestate",
-    "com_jomholiday",
-    "com_jomres",
-    "com_jomtube",
-    "com_joobb",
-    "com_joodb",
-    "com_jooget",
-    "com_joom12pic",
-    "com_joomanager",
-    "com_joomblog",
-    "com_joomclip",
-    "com_joomcrm",
-    "com_joomdle",
-    "com_joomdoc",
-    "com_joomdocs",
-    "com_joomgalaxy",
-    "com_joomgallery",
-    "com_joominaflileselling",
-    "com_joomla",
-    "com_joomla-visites",
-    "com_joomla_flash_uploader",
-    "com_joomlaboard",
-    "com_joomlaconnect_be",
-    "com_joomladate",
-    "com_joomlaflashfun",
-    "com_joomlaflickr",
-    "com_joomlalib",
-    "com_joomlapicasa2",
-    "com_joomlaquiz",
-    "com_joomlaradiov5",
-    "com_joomlaupdate",
-    "com_joomlaupdater",
-    "com_joomlavvz",
-    "com_joomlaxplorer",
-    "com_joomloads",
-    "com_joomloc",
-    "com_joomlub",
-    "com_joommail",
-    "com_joomnik",
-    "com_joomportfolio",
-    "com_joomradio",
-    "com_joomrecipe",
-    "com_joomsport",
-    "com_joomtouch",
-    "com_joomtracker",
-    "com_jooproperty",
-    "com_joovideo",
-    "com_jotloader",
-    "com_journal",
-    "com_jp_jobs",
-    "com_jpack",
-    "com_jpad",
-    "com_jphone",
-    "com_jphoto",
-    "com_jpodium",
-    "com_jpprojects",
-    "com_jprojectmanager",
-    "com_jquarks4s",
-    "com_jquickcontact",
-    "com_jr_tfb",
-    "com_jradio",
-    "com_jreactions",
-    "com_jresearch",
-    "com_jreservation",
-    "com_jreviews",
-    "com_jsautoz",
-    "com_jscalendar",
-    "com_jshop",
-    "com_jsjobs",
-    "com_jsplocation",
-    "com_jsptickets",
-    "com_jssupportticket",
-    "com_jstore",
-    "com_jsubscription",
-    "com_jsupport",
-    "com_jtagcalendar",
-    "com_jtagmembersdirectory",
-    "com_jtagminicart",
-    "com_jticketing",
-    "com_jtickets",
-    "com_jtips",
-    "com_jtm",
-    "com_juicy",
-    "com_jukebox",
-    "com_juliaportfolio",
-    "com_jumi",
-    "com_juser",
-    "com_jux_eventon",
-    "com_jux_real_estate",
-    "com_jvcomment",
-    "com_jvehicles",
-    "com_jvideo",
-    "com_jvideoclip",
-    "com_jvideodirect",
-    "com_jvotesystem",
-    "com_jw_allvideos",
-    "com_jwhmcs",
-    "com_jwmmxtd",
-    "com_k2",
-    "com_k2ajaxsearch",
-    "com_k2store",
-    "com_kbase",
-    "com_king",
-    "com_kissgallery",
-    "com_kk",
-    "com_kkcontent",
-    "com_knowledgebase",
-    "com_kochsuite",
-    "com_komento",
-    "com_konsultasi",
-    "com_kp",
-    "com_ksadvertiser",
-    "com_kunena",
-    "com_kunena_google_map_no_geocode",
-    "com_lead",
-    "com_leader",
-    "com_letterman",
-    "com_lexikon",
-    "com_libros",
-    "com_linkdirectory",
-    "com_linkr",
-    "com_listbingo",
-    "com_listing",
-    "com_listoffreeads",
-    "com_livechat",
-    "com_liveticker",
-    "com_lm",
-    "com_lmo",
-    "com_lms",
-    "com_lmsking",
-    "com_loginbox",
-    "com_loudmounth",
-    "com_loudmouth",
-    "com_lovefactory",
-    "com_lowcosthotels",
-    "com_lucygames",
-    "com_lurm",
-    "com_lyftenbloggie",
-    "com_macgallery",
-    "com_machine",
-    "com_mad4joomla",
-    "com_madeira",
-    "com_magazine",
-    "com_magazine_3_0_1",
-    "com_magicdealsweb",
-    "com_maian15",
-    "com_maianmedia",
-    "com_maianmusic",
-    "com_mailarchive",
-    "com_mailto",
-    "com_mambatstaff",
-    "com_mambelfish",
-    "com_mambospgm",
-    "com_mambowiki",
-    "com_manager",
-    "com_maplocator",
-    "com_maqmahelpdesk",
-    "com_market",
-    "com_marketplace",
-    "com_markt",
-    "com_masterforms",
-    "com_matamko",
-    "com_mcquiz",
-    "com_mdigg",
-    "com_media",
-    "com_media_library",
-    "com_mediaalert",
-    "com_medialibrary",
-    "com_mediamall",
-    "com_mediaslide",
-    "com_mediqna",
-    "com_memorix",
-    "com_memory",
-    "com_memorybook",
-    "com_menu",
-    "com_mezun",
-    "com_mgm",
-    "com_microdealfactory",
-    "com_minibb",
-    "com_misterestate",
-    "com_mmp",
-    "com_mmsblog",
-    "com_mochigames",
-    "com_model",
-    "com_modern_booking",
-    "com_mojo",
-    "com_monthlyarchive",
-    "com_moodle",
-    "com_moofaq",
-    "com_morfeoshow",
-    "com_mosets",
-    "com_mosforms",
-    "com_mosmedia",
-    "com_mospray",
-    "com_mosres",
-    "com_most",
-    "com_mostwantedrealestate",
-    "com_motor",
-    "com_movm",
-    "com_mp3",
-    "com_mp3_allopass",
-    "com_mscomment",
-    "com_mtfireeagle",
-    "com_mtree",
-    "com_multibanners",
-    "com_multimap",
-    "com_multiroot",
-    "com_multitier",
-    "com_muscol",
-    "com_music",
-    "com_musicgallery",
-    "com_mv_restaurantmenumanager",
-    "com_myalbum",
-    "com_myblog",
-    "com_mycar",
-    "com_mycontent",
-    "com_mydyngallery",
-    "com_myfiles",
-    "com_myform",
-    "com_mygallery",
-    "com_myhome",
-    "com_mymsg",
-    "com_myportfolio",
-    "com_mysms",
-    "com_mytube",
-    "com_n-forms",
-    "com_na",
-    "com_na_content",
-    "com_na_newsdescription",
-    "com_nbreal",
-    "com_neogallery",
-    "com_neorecruit",
-    "com_neoreferences",
-    "com_netinvoice",
-    "com_network",
-    "com_news",
-    "com_news_portal",
-    "com_newsfeeds",
-    "com_newsflash",
-    "com_newssearch",
-    "com_nfn",
-    "com_nfnaddressbook",
-    "com_nge",
-    "com_niceajaxpoll",
-    "com_nicetalk",
-    "com_ninjamonial",
-    "com_ninjamonials",
-    "com_nkc",
-    "com_noticeboard",
-    "com_noticia",
-    "com_noticias",
-    "com_novasfh",
-    "com_ns_downloadshop",
-    "com_ob",
-    "com_obsuggest",
-    "com_odudeprofile",
-    "com_omnirealestate",
-    "com_omphotogallery",
-    "com_onevote",
-    "com_ongallery",
-    "com_ongumatimesheet20",
-    "com_onismusic",
-    "com_onispetitions",
-    "com_onisquotes",
-    "com_onlineexam",
-    "com_onlineflashquiz",
-    "com_opencart",
-    "com_oprykningspoint_mc",
-    "com_ops",
-    "com_org",
-    "com_orgchart",
-    "com_ornekek",
-    "com_os_cck",
-    "com_osdownloads",
-    "com_osproperty",
-    "com_osservicesbooking",
-    "com_otzivi",
-    "com_ownbiblio",
-    "com_oziogallery",
-    "com_oziogallery2",
-    "com_packages",
-    "com_pago",
-    "com_pandafminigames",
-    "com_panoramic",
-    "com_parcoauto",
-    "com_party",
-    "com_paxgallery",
-    "com_paxxgallery",
-    "com_payage",
-    "com_payplans",
-    "com_pazzari_vm3",
-    "com_pbbooking",
-    "com_pc",
-    "com_pcchess",
-    "com_pccookbook",
-    "com_pennyfactory",
-    "com_people",
-    "com_peoplebook",
-    "com_perchagallery",
-    "com_perchaimageattach",
-    "com_performs",
-    "com_personal",
-    "com_philaform",
-    "com_phocadocumentation",
-    "com_phocadownload",
-    "com_phocagallery",
-    "com_phocamaps",
-    "com_photo",
-    "com_photobattle",
-    "com_photoblog",
-    "com_photocontest",
-    "com_photomapgallery",
-    "com_php",
-    "com_phpbridge",
-    "com_phpshop",
-    "com_picasa2gallery",
-    "com_picsell",
-    "com_pinboard",
-    "com_pms",
-    "com_pofos",
-    "com_poll",
-    "com_pollxt",
-    "com_ponygallery",
-    "com_portafolio",
-    "com_portfol",
-    "com_portfolio",
-    "com_portfoliogallery",
-    "com_poweradmin",
-    "com_powermail",
-    "com_prayercenter",
-    "com_press",
-    "com_pressrelease",
-    "com_preventive",
-    "com_price_alert",
-    "com_prime",
-    "com_pro",
-    "com_pro_desk",
-    "com_prod",
-    "com_product",
-    "com_productbook",
-    "com_products",
-    "com_productshowcase",
-    "com_profile",
-    "com_profiler",
-    "com_projectfork",
-    "com_projectlog",
-    "com_projects",
-    "com_proofreader",
-    "com_properties",
-    "com_propertylab",
-    "com_puarcade",
-    "com_publication",
-    "com_publisher",
-    "com_qcontacts",
-    "com_qpersonel",
-    "com_question",
-    "com_questions",
-    "com_quickfaq",
-    "com_quicknews",
-    "com_quiz",
-    "com_quran",
-    "com_races",
-    "com_radio",
-    "com_rafflefactory",
-    "com_rand",
-    "com_ranking",
-    "com_rapidrecipe",
-    "com_rbids",
-    "com_rd_download",
-    "com_rdautos",
-    "com_realestatemanager",
-    "com_realpin",
-    "com_realtyna",
-    "com_recerca",
-    "com_recipe",
-    "com_recly",
-    "com_record",
-    "com_redshop",
-    "com_redtwitter",
-    "com_referenzen",
-    "com_registration",
-    "com_registrationpro",
-    "com_rekry",
-    "com_remository",
-    "com_reporter",
-    "com_reservations",
-    "com_resman",
-    "com_restaurante",
-    "com_restaurantguide",
-    "com_ricette",
-    "com_rokdownloads",
-    "com_rokmodule",
-    "com_roommgmt",
-    "com_route",
-    "com_rpl",
-    "com_rpx",
-    "com_rsappt_pro2",
-    "com_rsappt_pro3",
-    "com_rsbook_15",
-    "com_rscomments",
-    "com_rsfiles",
-    "com_rsgallery",
-    "com_rsgallery2",
-    "com_rsmonials",
-    "com_rss",
-    "com_rssreader",
-    "com_rssxt",
-    "com_rwcards",
-    "com_s5clanroster",
-    "com_salesrep",
-    "com_sanpham",
-    "com_sar_news",
-    "com_saxumastro",
-    "com_saxumnumerology",
-    "com_saxumpicker",
-    "com_sbsfile",
-    "com_scheduling",
-    "com_school",
-    "com_schools",
-    "com_science",
-    "com_search",
-    "com_searchlog",
-    "com_sebercart",
-    "com_sectionex",
-    "com_securityimages",
-    "com_seek",
-    "com_sef",
-    "com_seminar",
-    "com_serie",
-    "com_sermon",
-    "com_sermonspeaker",
-    "com_serverstat",
-    "com_sexypolling",
-    "com_seyret",
-    "com_sg",
-    "com_sgicatalog",
-    "com_shop",
-    "com_shoutbox",
-    "com_showdown",
-    "com_siirler",
-    "com_simgenealogy",
-    "com_simple",
-    "com_simple_review",
-    "com_simpleboard",
-    "com_simplecalendar",
-    "com_simpledownload",
-    "com_simplefaq",
-    "com_simpleimageupload",
-    "com_simplemembership",
-    "com_simplephotogallery",
-    "com_simpleshop",
-    "com_simpleswfupload",
-    "com_sitemap",
-    "com_slider",
-    "com_slideshow",
-    "com_smartseller",
-    "com_smartshoutbox",
-    "com_smartsite",
-    "com_smestorage",
-    "com_smf",
-    "com_smslist",
-    "com_sobi2",
-    "com_soccerbet",
-    "com_socialads",
-    "com_socialfactory",
-    "com_socialpinboard",
-    "com_software",
-    "com_solidres",
-    "com_solution",
-    "com_some",
-    "com_soundset",
-    "com_spa",
-    "com_spain",
-    "com_spec",
-    "com_spidercalendar",
-    "com_spidercatalog",
-    "com_spiderfacebook",
-    "com_spiderfaq",
-    "com_spielothek",
-    "com_spmoviedb",
-    "com_sponsorwall",
-    "com_sportfusion",
-    "com_sportspredictions",
-    "com_sppagebuilder",
-    "com_spsnewsletter",
-    "com_sqlreport",
-    "com_squadmanagement",
-    "com_staffmaster",
-    "com_start",
-    "com_staticxt",
-    "com_store",
-    "com_storedirectory",
-    "com_streetguess",
-    "com_surveyforce",
-    "com_surveymanager",
-    "com_svmap",
-    "com_swapfactory",
-    "com_sweetykeeper",
-    "com_swmenufree4",
-    "com_swmenupro",
-    "com_szallasok",
-    "com_tag",
-    "com_tariff",
-    "com_tax",
-    "com_teacher",
-    "com_team",
-    "com_teamdisplay",
-    "com_teams",
-    "com_tech",
-    "com_tech_article",
-    "com_techfolio",
-    "com_television",
-    "com_thopper",
-    "com_threate",
-    "com_thyme",
-    "com_ticketbook",
-    "com_tickets",
-    "com_tienda",
-    "com_timereturns",
-    "com_timetable",
-    "com_timetableschedule",
-    "com_timetrack",
-    "com_tophotelmodule",
-    "com_topics",
-    "com_topmenu",
-    "com_tour",
-    "com_tour_toto",
-    "com_tpdugg",
-    "com_tpjobs",
-    "com_trabalhe_conosco",
-    "com_trade",
-    "com_trading",
-    "com_travelbook",
-    "com_tree",
-    "com_treeg",
-    "com_tsonymf",
-    "com_ttvideo",
-    "com_tupinambis",
-    "com_turtushout",
-    "com_tweetla",
-    "com_twitchtv",
-    "com_uhp",
-    "com_uhp2",
-    "com_ultimateportfolio",
-    "com_uniterevolution2",
-    "com_units",
-    "com_universal",
-    "com_upl",
-    "com_user",
-    "com_userbench",
-    "com_userextranet",
-    "com_users",
-    "com_userstatus",
-    "com_utchat",
-    "com_vaccount",
-    "com_vbizz",
-    "com_vehiclemanager",
-    "com_versioning",
-    "com_videodb",
-    "com_videoflow",
-    "com_videogallery",
-    "com_videogallerylite",
-    "com_videos",
-    "com_videowhisper_2wvc",
-    "com_vikappointments",
-    "com_vikbooking",
-    "com_vikrealestate",
-    "com_vikrentcar",
-    "com_vikrentitems",
-    "com_virtualmoney",
-    "com_virtuemart",
-    "com_visa",
-    "com_visualcalendar",
-    "com_vjdeo",
-    "com_vmap",
-    "com_voj",
-    "com_volunteer",
-    "com_vr",
-    "com_vrestaurant",
-    "com_vreview",
-    "com_vwishlist",
-    "com_vxdate",
-    "com_wallpapers",
-    "com_waticketsystem",
-    "com_wdsubscriptions",
-    "com_webeecomment",
-    "com_weberpcustomer",
-    "com_webhosting",
-    "com_weblinks",
-    "com_webring",
-    "com_webtv",
-    "com_wgpicasa",
-    "com_wines",
-    "com_wire_immogest",
-    "com_wisroyq",
-    "com_wkoc",
-    "com_wmi",
-    "com_wmt_content_timeline",
-    "com_wmtgallery",
-    "com_wmtpic",
-    "com_wmtportfolio",
-    "com_wmtrssreader",
-    "com_worldrates",
-    "com_wrapper",
-    "com_x-shop",
-    "com_xball",
-    "com_xcloner-backupandrestore",
-    "com_xcloner-backupandstore",
-    "com_xcomp",
-    "com_xeslidegalfx",
-    "com_xevidmegahd",
-    "com_xewebtv",
-    "com_xfaq",
-    "com_xgallery",
-    "com_xmap",
-    "com_xmovie",
-    "com_xobbix",
-    "com_xsstream-dm",
-    "com_xvs",
-    "com_yanc",
-    "com_ybggal",
-    "com_yellowpages",
-    "com_yelp",
-    "com_yjcontactus",
-    "com_ynews",
-    "com_youtube",
-    "com_youtubegallery",
-    "com_yvcomment",
-    "com_zcalendar",
-    "com_zelig",
-    "com_zhbaidumap",
-    "com_zhgooglemap",
-    "com_zhyandexmap",
-    "com_zimbcomment",
-    "com_zimbcore",
-    "com_zina",
-    "com_zoom",
-    "com_zoomportfolio",
-    "com_ztautolink",
-]
+"""The component database. components.tsv ships with the package, one component
+per line sorted by name, with tab-separated fields:
+
+    name    popularity    artifacts
+
+popularity is a rough estimate of the percentage of Joomla sites that have
+the component installed, used as the prior for scan ordering in
+joom3y.priority. artifacts is a comma-separated list of extra paths,
+relative to the component directory, that identify it or its version. The
+file is only read on first use and kept as one bytes object with an array
+of line offsets, so names are binary-searched in place instead of being
+held as thousands of separate strings."""
+
+from array import array
+from bisect import bisect_left
+from fnmatch import fnmatchcase
+from importlib.resources import files
+from typing import NamedTuple
+
+# Glob characters that end the literal prefix of a pattern.
+WILDCARDS = "*?["
+
+
+class Component(NamedTuple):
+    name: str
+    popularity: int
+    artifacts: tuple[str, ...]
+
+
+class ComponentDatabase:
+    """A sorted string table of components.
+
+    Args:
+        data (bytes): The contents of a components.tsv file.
+    """
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._offsets = array("I")
+        start = 0
+        while start < len(data):
+            self._offsets.append(start)
+            end = data.find(b"\n", start)
+            start = len(data) if end == -1 else end + 1
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._name(i)
+
+    def _line(self, i: int) -> bytes:
+        start = self._offsets[i]
+        end = self._data.find(b"\n", start)
+        return self._data[start : None if end == -1 else end]
+
+    def _name(self, i: int) -> str:
+        line = self._line(i)
+        return line[: line.find(b"\t")].decode()
+
+    def _record(self, i: int) -> Component:
+        name, popularity, artifacts = self._line(i).decode().split("\t")
+        return Component(
+            name,
+            int(popularity or 0),
+            tuple(filter(None, artifacts.split(","))),
+        )
+
+    def _bisect(self, name: str) -> int:
+        return bisect_left(range(len(self)), name, key=self._name)
+
+    def get(self, name: str) -> Component | None:
+        i = self._bisect(name)
+        if i < len(self) and self._name(i) == name:
+            return self._record(i)
+        return None
+
+    def prefix(self, prefix: str) -> list[str]:
+        """Returns the names starting with prefix, found by binary search."""
+        names = []
+        for i in range(self._bisect(prefix), len(self)):
+            name = self._name(i)
+            if not name.startswith(prefix):
+                break
+            names.append(name)
+        return names
+
+    def select(self, patterns: str | None = None) -> list[str]:
+        """Returns the names matching any of the comma-separated glob
+        patterns, or every name when there are none. Only the range of the
+        table sharing a pattern's literal prefix is matched against it."""
+        if not patterns:
+            return list(self)
+
+        selected = set()
+        for pattern in filter(None, (p.strip() for p in patterns.split(","))):
+            cut = min(
+                (pattern.find(c) for c in WILDCARDS if c in pattern),
+                default=len(pattern),
+            )
+            selected.update(
+                name
+                for name in self.prefix(pattern[:cut])
+                if fnmatchcase(name, pattern)
+            )
+        return sorted(selected)
+
+
+_database: ComponentDatabase | None = None
+
+
+def database() -> ComponentDatabase:
+    """Loads the packaged component database on first use."""
+    global _database
+    if _database is None:
+        _database = ComponentDatabase(
+            files("joom3y").joinpath("components.tsv").read_bytes()
+        )
+    return _database
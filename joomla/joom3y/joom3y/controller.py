@@ -0,0 +1,202 @@
+"""An adaptive limit on the requests in flight to a target. It starts small and
+doubles each round while the target stays healthy (slow start), then grows
+by one per round (additive increase). Timeouts, 429 and 503 answers and
+Retry-After headers halve it at once, and a round whose median latency has
+drifted well above the best seen, or with too many errors, shrinks it
+(multiplicative decrease). --threads and --limit become ceilings rather than
+the actual concurrency."""
+
+import statistics
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import asyncio
+
+# A round's median latency above this multiple of the best median, plus the
+# slack in seconds so sub-millisecond jitter doesn't count, backs off.
+LATENCY_TOLERANCE = 2.0
+LATENCY_SLACK = 0.02
+# A round is at least this many requests, so its median means something.
+MIN_ROUND = 16
+# A round with a larger share of failed requests backs off.
+ERROR_RATE = 0.05
+OVERLOAD_STATUSES = (429, 503)
+
+
+def retry_after_seconds(value: str | None) -> float:
+    """Parses a Retry-After header, in seconds or as an HTTP date."""
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Controller:
+    """An AIMD controller of the requests in flight. Callers hold a slot()
+    (or aslot() under asyncio) around each request and record() its outcome.
+
+    Args:
+        maximum (int): The ceiling of the limit.
+        initial (int): The starting limit.
+        minimum (int): The floor of the limit.
+    """
+
+    def __init__(self, maximum: int, initial: int = 4, minimum: int = 1):
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.limit = max(self.minimum, min(initial, self.maximum))
+        self.peak = self.limit
+        self.inflight = 0
+        self.slow_start = True
+        self.paused_until = 0.0
+        self.decisions: Counter[str] = Counter()
+
+        self._latencies: list[float] = []
+        self._errors = 0
+        self._overloads = 0
+        self._best_latency: float | None = None
+        self._cond = threading.Condition()
+        self._async_cond: "asyncio.Condition | None" = None
+
+    def _wait_time(self) -> float | None:
+        """How long a caller must wait for a slot, 0 when it can go now, or
+        None when it has to wait for a release."""
+        pause = self.paused_until - time.monotonic()
+        if pause > 0:
+            return pause
+        if self.inflight >= self.limit:
+            return None
+        return 0
+
+    @contextmanager
+    def slot(self):
+        with self._cond:
+            while (wait := self._wait_time()) != 0:
+                self._cond.wait(wait)
+            self.inflight += 1
+            # Pass the wakeup on if the limit grew past one more slot.
+            if self._wait_time() == 0:
+                self._cond.notify()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.inflight -= 1
+                self._cond.notify()
+
+    @asynccontextmanager
+    async def aslot(self):
+        import asyncio
+
+        if self._async_cond is None:
+            self._async_cond = asyncio.Condition()
+        cond = self._async_cond
+
+        async with cond:
+            while (wait := self._wait_time()) != 0:
+                if wait is None:
+                    await cond.wait()
+                else:
+                    cond.release()
+                    try:
+                        await asyncio.sleep(wait)
+                    finally:
+                        await cond.acquire()
+            self.inflight += 1
+            if self._wait_time() == 0:
+                cond.notify()
+        try:
+            yield
+        finally:
+            async with cond:
+                self.inflight -= 1
+                cond.notify()
+
+    def record(
+        self,
+        latency: float,
+        status: int | None = None,
+        retry_after: str | None = None,
+        timeout: bool = False,
+    ):
+        """Records the outcome of a request: its status, or None when it
+        failed, and whether it failed by timing out."""
+        with self._cond:
+            pause = retry_after_seconds(retry_after)
+            if pause:
+                self.paused_until = max(
+                    self.paused_until, time.monotonic() + pause
+                )
+            if timeout or status in OVERLOAD_STATUSES or pause:
+                # Back off once per round, not once per failed request.
+                if not self._overloads:
+                    reason = "timeout" if timeout else "overload"
+                    self._decrease(0.5, reason)
+                self._overloads += 1
+            elif status is None:
+                self._errors += 1
+            else:
+                self._latencies.append(latency)
+
+            samples = len(self._latencies) + self._errors + self._overloads
+            if samples >= max(self.limit, MIN_ROUND):
+                self._end_round(samples)
+            self._cond.notify_all()
+
+    def _end_round(self, samples: int):
+        median = (
+            statistics.median(self._latencies) if self._latencies else None
+        )
+        if median is not None and (
+            self._best_latency is None or median < self._best_latency
+        ):
+            self._best_latency = median
+
+        if self._overloads:
+            pass
+        elif self._errors / samples > ERROR_RATE:
+            self._decrease(0.5, "errors")
+        elif median is not None and median > (
+            self._best_latency * LATENCY_TOLERANCE + LATENCY_SLACK
+        ):
+            self._decrease(0.75, "latency")
+        elif self.slow_start:
+            self._set(self.limit * 2, "increase")
+        else:
+            self._set(self.limit + 1, "increase")
+
+        self._latencies.clear()
+        self._errors = 0
+        self._overloads = 0
+
+    def _decrease(self, factor: float, reason: str):
+        self.slow_start = False
+        self._set(int(self.limit * factor), reason)
+
+    def _set(self, limit: int, reason: str):
+        limit = max(self.minimum, min(limit, self.maximum))
+        if limit != self.limit:
+            self.decisions[reason] += 1
+        self.limit = limit
+        self.peak = max(self.peak, limit)
+
+    def summary(self) -> str:
+        decisions = ", ".join(
+            f"{count} {reason}"
+            for reason, count in sorted(self.decisions.items())
+        )
+        return (
+            f"limit {self.limit} (peak {self.peak}, ceiling {self.maximum}), "
+            f"decisions: {decisions or 'none'}"
+        )
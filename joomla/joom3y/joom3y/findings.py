@@ -0,0 +1,161 @@
+"""Findings of a scan as typed records. Workers only put them on a queue, and
+one writer thread renders them, as the usual console lines or as JSON lines
+(--output jsonl) to a file or stdout, so no worker ever waits on the console
+or on rendering."""
+
+import json
+import queue
+import sys
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+from rich import print
+from rich.markup import escape
+
+# The kinds of files found in component directories, printed by label.
+FILE_KINDS = ("readme", "license", "changelog", "manifest", "artifact")
+# A jsonl output is flushed at least once every this many findings.
+FLUSH_RECORDS = 256
+
+
+class Finding(NamedTuple):
+    target: str
+    kind: str
+    path: str
+    component: str | None = None
+    status: int | None = None
+    length: int | None = None
+    elapsed: float | None = None
+    note: str | None = None
+
+
+# The printers take the target's text, url, paths and notes, escaped, so
+# brackets in them are printed rather than read as markup.
+
+
+def print_component(url, component, note=None):
+    print(
+        "[green]Component found: "
+        + component
+        + "\t > "
+        + url
+        + "/index.php?option="
+        + component
+    )
+    if note:
+        print("\t " + note)
+
+
+def print_file(url, path, label):
+    print(f"\t [green]{label}[/green] file found \t > [blue]{url}{path}[blue]")
+
+
+def print_index(url, path):
+    print(f"\t INDEX file descriptive found \t > {url}{path}")
+
+
+def print_listing(url, path):
+    print("\t [green]Explorable Directory \t > " + url + path)
+
+
+def render(finding: Finding):
+    """Prints a finding as a console line."""
+    url, path = escape(finding.target), escape(finding.path)
+    if finding.kind == "component":
+        print_component(
+            url,
+            escape(finding.component),
+            finding.note and escape(finding.note),
+        )
+    elif finding.kind in FILE_KINDS:
+        print_file(url, path, finding.kind.upper())
+    elif finding.kind == "index":
+        print_index(url, path)
+    elif finding.kind == "listing":
+        print_listing(url, path)
+    elif finding.kind == "robots":
+        print("[blue]Robots file found: \t \t > " + url + path)
+    elif finding.kind == "error_log":
+        print("[blue]Error log found: \t \t > " + url + path)
+    elif finding.kind == "version":
+        print(f"[green] Path {url + path} resolved, getting version string")
+        for line in (finding.note or "").splitlines():
+            print("\t", escape(line))
+
+
+def to_json(finding: Finding) -> str:
+    record = finding._asdict()
+    record["url"] = finding.target + finding.path
+    return json.dumps(record)
+
+
+class FindingWriter:
+    """The thread writing the findings of a scan.
+
+    Args:
+        output (str): "text" for console lines, or "jsonl" for one JSON
+            object per finding.
+        path (Path | None): The file jsonl is written to, or None for
+            stdout.
+    """
+
+    def __init__(self, output: str = "text", path: Path | None = None):
+        self.output = output
+        self._queue: queue.Queue[Finding | str | None] = queue.Queue()
+        self._file = None
+        if output == "jsonl":
+            self._file = sys.stdout if path is None else open(path, "w")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def emit(self, finding: Finding):
+        self._queue.put(finding)
+
+    def message(self, text: str):
+        """Queues a console line, printed in order with the findings."""
+        self._queue.put(text)
+
+    def _run(self):
+        unflushed = 0
+        while (finding := self._queue.get()) is not None:
+            # A finding that can't be written is reported, and never stops
+            # the thread, which wait() and close() rely on.
+            try:
+                if isinstance(finding, str):
+                    print(finding)
+                elif self._file is None:
+                    render(finding)
+                else:
+                    self._file.write(to_json(finding) + "\n")
+                    unflushed += 1
+                    # Flush once a burst is written rather than line by line.
+                    if unflushed >= FLUSH_RECORDS or self._queue.empty():
+                        self._file.flush()
+                        unflushed = 0
+            except Exception as e:
+                print(f"[red]Could not write a finding: {escape(repr(e))}")
+            finally:
+                self._queue.task_done()
+        if self._file is not None:
+            self._file.flush()
+        self._queue.task_done()
+
+    def wait(self):
+        """Blocks until the findings emitted so far are written."""
+        self._queue.join()
+
+    def close(self):
+        """Writes the findings still queued and stops the thread."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+        if self._file is not None and self._file is not sys.stdout:
+            self._file.close()
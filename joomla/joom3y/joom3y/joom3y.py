@@ -1,292 +1,571 @@
 import os
+import time
+from contextlib import closing
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from importlib.util import find_spec
 
-import requests
 import rich
-from bs4 import BeautifulSoup
 from rich import print
+from rich.markup import escape
 from rich.progress import track
 
-from joom3y.components import COMPONENTS
+from joom3y.archive import Archive
+from joom3y.breaker import CircuitBreaker
+from joom3y.calibrate import calibrate, case_insensitive, supports_head
+from joom3y.components import database
+from joom3y.controller import Controller
+from joom3y.findings import Finding, FindingWriter, render
+from joom3y.journal import Journal, Pending
+from joom3y.listing import (
+    MAX_LISTING_BYTES,
+    Harvest,
+    Inventory,
+    ListingDetector,
+)
+from joom3y.metrics import Metrics
+from joom3y.priority import History, MissStreak
+from joom3y.probes import VERSION_PATHS, Plan, presence_probes
+from joom3y.ratelimit import RateLimiter
+from joom3y.transport import EXISTS_BODY, Transport
+from joom3y.url import Url
+
+# The note of the findings read off a directory listing instead of probed.
+LISTED = "In the directory listing"
+# What presence returns when no probe hit but some failed, so the component
+# is neither found nor known to be missing.
+UNANSWERED = object()
+
+
+def check_url(transport: Transport, path: str = "/"):
+    """Returns the status of path, or None when the request failed. Paths of
+    a kind calibration found a soft-404 signature for are fetched with one
+    GET and answer 404 when it matches, the others get a body-less existence
+    probe. Outcomes are journaled, and answered from the
+    journal of a resumed scan."""
+    status = transport.journal.outcome(transport.url, path)
+    if status is not None:
+        return status
 
-REQUEST_TIMEOUT = 5
-USER_AGENT = {
-    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:10.0) Gecko/20100101 Firefox/10.0"
-}
-
-
-def check_url(url: str, path: str = "/"):
-    fullurl = url + path
     try:
-        conn = requests.get(
-            fullurl, headers=USER_AGENT, timeout=REQUEST_TIMEOUT
-        )
-        return conn.status_code
-    except Exception as e:
-        print(f"[red]error {e}")
+        # A body-less probe would have to be followed by a GET whenever its
+        # status is the catch-all page's, so a signed kind sends the GET.
+        if transport.soft404 and transport.soft404.signed(path):
+            conn = transport.get(path, need_body=True)
+            status = conn.status_code
+            if transport.soft404.matches(path, status, conn.content):
+                status = 404
+        else:
+            status = transport.exists(path).status_code
+    except Exception:
+        # Counted by the transport's breaker and reported in the summary.
         return None
 
+    transport.journal.probe(transport.url, path, status)
+    return status
+
 
-def get_content_length(url: str, path: str = "/"):
-    fullurl = url + path
+def get_content_length(transport: Transport, path: str = "/"):
     try:
-        conn = requests.head(
-            fullurl, headers=USER_AGENT, timeout=REQUEST_TIMEOUT
-        )
-        return conn.headers["content-length"]
+        conn = transport.head(path)
+        return int(conn.headers["content-length"])
     except Exception:
         return -1
 
 
-def check_and_print(url, paths, label):
-    for path in paths:
-        if check_url(url, path) == 200:
-            print(
-                f"\t [green]{label}[/green] file found \t > [blue]{url}{path}[blue]"
-            )
+def report(
+    transport: Transport,
+    kind: str,
+    path: str,
+    component: str | None = None,
+    status: int | None = None,
+    start: float | None = None,
+    note: str | None = None,
+    length: int | None = None,
+):
+    """Hands a finding to the scan's writer, or prints it when there is no
+    writer. Its length comes from the cached response of path, a GET or the
+    HEAD of an existence probe, when there is one, or else from length, and
+    its elapsed time from start."""
+    url = transport.probes.url(path)
+    entry = transport.cache.peek("GET", url) or transport.cache.peek(
+        "HEAD", url
+    )
+    if entry is not None:
+        if "content-length" in entry.headers:
+            length = int(entry.headers["content-length"])
+        elif entry.content is not None:
+            length = len(entry.content)
+
+    finding = Finding(
+        transport.url,
+        kind,
+        path,
+        component,
+        status,
+        length,
+        None if start is None else time.perf_counter() - start,
+        note,
+    )
+    if transport.findings is None:
+        render(finding)
+    else:
+        transport.findings.emit(finding)
+
+
+def notice(transport: Transport, text: str):
+    """Prints a console line in order with the findings of the scan."""
+    if transport.findings is None:
+        print(text)
+    else:
+        transport.findings.message(text)
+
+
+def read_listing(transport: Transport, path: str) -> bytes | None:
+    """The body of path, up to just over MAX_LISTING_BYTES, when it is a
+    directory listing, or None. A body that isn't one is only read as far as
+    the detector needs."""
+    detector = ListingDetector()
+    verdict = None
+    body = bytearray()
+    try:
+        with closing(transport.stream(path)) as chunks:
+            for chunk in chunks:
+                body += chunk
+                if verdict is None:
+                    verdict = detector.feed(chunk)
+                    if verdict is False:
+                        return None
+                if len(body) > MAX_LISTING_BYTES:
+                    break
+    except Exception:
+        return None
+    if verdict is None and not detector.close():
+        return None
+    return bytes(body)
 
 
-def check_readme(url, component):
-    paths = [
-        "/components/" + component + "/README.txt",
-        "/components/" + component + "/readme.txt",
-        "/components/" + component + "/README.md",
-        "/components/" + component + "/readme.md",
-        "/administrator/components/" + component + "/README.txt",
-        "/administrator/components/" + component + "/readme.txt",
-        "/administrator/components/" + component + "/README.md",
-        "/administrator/components/" + component + "/readme.md",
-    ]
-    check_and_print(url, paths, "README")
-
-
-def check_license(url, component):
-    paths = [
-        "/components/" + component + "/LICENSE.txt",
-        "/components/" + component + "/license.txt",
-        "/administrator/components/" + component + "/LICENSE.txt",
-        "/administrator/components/" + component + "/license.txt",
-        "/components/" + component + "/" + component[4:] + ".xml",
-        "/administrator/components/"
-        + component
-        + "/"
-        + component[4:]
-        + ".xml",
-    ]
-    check_and_print(url, paths, "LICENSE")
-
-
-def check_changelog(url, component):
-    paths = [
-        "/components/" + component + "/CHANGELOG.txt",
-        "/components/" + component + "/changelog.txt",
-        "/administrator/components/" + component + "/CHANGELOG.txt",
-        "/administrator/components/" + component + "/changelog.txt",
-    ]
-    check_and_print(url, paths, "CHANGELOG")
-
-
-def check_mainfest(url, component):
-    paths = [
-        "/components/" + component + "/MANIFEST.xml",
-        "/components/" + component + "/manifest.xml",
-        "/administrator/components/" + component + "/MANIFEST.xml",
-        "/administrator/components/" + component + "/manifest.xml",
-    ]
-    check_and_print(url, paths, "MANIFEST")
-
-
-def check_index(url, component):
-    paths = [
-        "/components/" + component + "/index.htm",
-        "/components/" + component + "/index.html",
-        "/administrator/components/" + component + "/INDEX.htm",
-        "/administrator/components/" + component + "/INDEX.html",
-    ]
-    for path in paths:
-        if (
-            check_url(url, path) == 200
-            and get_content_length(url, path) > 1000
-        ):
-            print(f"\t INDEX file descriptive found \t > {url}{path}")
+def harvest(transport: Transport, directory: str) -> Inventory | None:
+    """The inventory of the tree under directory from its listing and those
+    of its subdirectories, or None when directory isn't a listing."""
+    body = read_listing(transport, directory)
+    if body is None:
+        return None
+    tree = Harvest(directory, body, transport.probes.url)
+    while (subdirectory := tree.next()) is not None:
+        tree.add(read_listing(transport, subdirectory))
+    return tree.inventory()
 
 
-def index_of(url, path="/"):
-    fullurl = url + path
-    try:
-        page = requests.get(
-            fullurl, headers=USER_AGENT, timeout=REQUEST_TIMEOUT
-        )
-        soup = BeautifulSoup(page.text, "html.parser")
-        if soup.title:
-            titlepage = soup.title.string
-            if titlepage and "Index of /" in titlepage:
-                return True
-            else:
-                return False
+def inventory(transport: Transport, directory: str) -> Inventory | None:
+    return transport.inventories.get(
+        directory, lambda: harvest(transport, directory)
+    )
+
+
+def listed(transport: Transport, root: str | None, path: str) -> bool | None:
+    """Whether the listing of root shows path, or None when it can't tell,
+    because there is no root, it isn't a listing, or the directory of path
+    wasn't listed in full."""
+    if root is None:
+        return None
+    tree = inventory(transport, root)
+    if tree is None or not tree.covers(path):
+        return None
+    transport.metrics.add_listed()
+    return tree.has(path, transport.case_insensitive)
+
+
+def check_file(transport, component, path, kind, root=None):
+    start = time.perf_counter()
+    found = listed(transport, root, path)
+    if found:
+        report(transport, kind, path, component, None, start, LISTED)
+    elif found is None and check_url(transport, path) == 200:
+        report(transport, kind, path, component, 200, start)
+
+
+def check_index_file(transport, component, path, root=None):
+    start = time.perf_counter()
+    found = listed(transport, root, path)
+    if found is None:
+        found = check_url(transport, path) == 200
+    if found and get_content_length(transport, path) > 1000:
+        report(transport, "index", path, component, 200, start)
+
+
+def check_listing(transport, component, path, names=None):
+    """Reports a directory listing, and the artifacts it shows in the
+    subdirectories, whose names are in names. The directory's own files
+    are reported by the probes it answers."""
+    start = time.perf_counter()
+    tree = inventory(transport, path)
+    if tree is None:
+        return
+    report(
+        transport,
+        "listing",
+        path,
+        component,
+        None,
+        start,
+        f"{len(tree.files)} files",
+        tree.size,
+    )
+    for kind, file in listed_artifacts(tree, path, names or {}):
+        report(transport, kind, file, component, None, start, LISTED)
+
+
+def listed_artifacts(tree: Inventory, directory: str, names):
+    """The (kind, path) of the files of the subdirectories of directory that
+    are named like one of its artifacts."""
+    for file in sorted(tree.files):
+        name = file[file.rfind("/") + 1 :]
+        if len(file) - len(name) > len(directory) and name.lower() in names:
+            yield names[name.lower()], file
+
+
+def presence(transport: Transport, component: str):
+    """Runs the presence probes of a component, reports the one that hit and
+    returns its note and listing directories, None when all of them answered
+    and none hit, or UNANSWERED when none hit and some failed."""
+    start = time.perf_counter()
+    failed = False
+    for path, note, listings in presence_probes(component):
+        status = check_url(transport, path)
+        if status == 200:
+            report(transport, "component", path, component, 200, start, note)
+            return note, listings
+        failed = failed or status is None
+    return UNANSWERED if failed else None
+
+
+def settle(transport, history, journal, component, found) -> bool | None:
+    """Records a presence result in the history and the journal, and
+    returns whether the component was found, or None when that is unknown.
+    Unknown components, and misses while the target's circuit is open, are
+    left out, so a resumed scan probes them again."""
+    if found is UNANSWERED:
+        return None
+    if transport.breaker.closed:
+        history.record(component, found is not None)
+        if found is None:
+            journal.complete(transport.url, component, False)
+    return found is not None
+
+
+def enrichment(transport: Transport, component, listings):
+    """The enrichment probes of a found component as (check, args) pairs,
+    from the scan's probe plan, with case variants folded on case-insensitive
+    targets. The probes are independent of each other, so they can run in any
+    order and in parallel."""
+    plan = transport.plan
+    fold_case = transport.case_insensitive
+    if fold_case:
+        transport.metrics.add_folded(plan.folds(component))
+    # The probes under a directory whose listing is checked wait for it, and
+    # are answered from it when it is one.
+    roots = listings if "listing" in plan.kinds else ()
+    names = {root: {} for root in roots}
+    probes = []
+    for kind, path in plan.expand(component, listings, fold_case):
+        root = next((root for root in roots if path.startswith(root)), None)
+        if kind == "index":
+            probes.append((check_index_file, (component, path, root)))
+        elif kind == "listing":
+            probes.append((check_listing, (component, path, names[path])))
         else:
-            return False
-    except Exception as _:
-        return False
+            probes.append((check_file, (component, path, kind, root)))
+            if root is not None:
+                names[root][path[len(root) :].lower()] = kind
+    return probes
 
 
-def scanner(url: str, component: str):
-    if check_url(url, "/index.php?option=" + component) == 200:
-        print(
-            "Component found: "
-            + component
-            + "\t > "
-            + url
-            + "/index.php?option="
-            + component
+def scanner(transport: Transport, component: str):
+    found = presence(transport, component)
+    if found is None or found is UNANSWERED:
+        return
+
+    note, listings = found
+    for check, args in enrichment(transport, component, listings):
+        check(transport, *args)
+
+
+def scan_components(
+    transport: Transport,
+    components,
+    threads: int,
+    enrich_threads: int,
+    history: History | None = None,
+    stop_after_misses: int | None = None,
+):
+    """Scans components in two stages with a worker pool each. The presence
+    pool probes every component, and each hit streams into the enrichment
+    pool as soon as it arrives, with its artifact probes running in
+    parallel. Presence results are recorded in the history and the journal,
+    and the components still queued are dropped after stop_after_misses
+    misses in a row."""
+    if history is None:
+        history = History()
+    streak = MissStreak(stop_after_misses)
+    journal = transport.journal
+
+    with (
+        ThreadPoolExecutor(max_workers=threads) as presence_pool,
+        ThreadPoolExecutor(max_workers=enrich_threads) as enrich_pool,
+    ):
+        futures = {
+            presence_pool.submit(presence, transport, component): component
+            for component in components
+        }
+        enriching = []
+        stopped = False
+        # Wrap as_completed with track to update the progress bar as tasks complete.
+        for future in track(as_completed(futures), total=len(futures)):
+            if future.cancelled():
+                continue
+
+            found = future.result()
+            component = futures[future]
+            hit = settle(transport, history, journal, component, found)
+            if hit is None:
+                continue
+            if streak.record(hit) and not stopped:
+                stopped = True
+                skipped = sum(pending.cancel() for pending in futures)
+                if skipped:
+                    print(
+                        f"[yellow]Stopping after {streak.misses} misses in a "
+                        f"row, {skipped} components skipped"
+                    )
+            if not hit:
+                continue
+
+            note, listings = found
+            probes = enrichment(transport, component, listings)
+            pending = Pending(journal, transport.url, component, len(probes))
+            for check, args in probes:
+                future = enrich_pool.submit(check, transport, *args)
+                future.add_done_callback(pending.callback)
+                enriching.append(future)
+
+        for future in track(
+            as_completed(enriching),
+            total=len(enriching),
+            description="Enriching...",
+        ):
+            future.result()
+
+
+def normalize_url(url: str) -> str:
+    if not url.startswith("http://") and not url.startswith("https://"):
+        raise ValueError(f"url {url} must have a scheme.")
+
+    # Remove the ending to the url
+    if url.endswith("/"):
+        url = url[:-1]
+    # Raises on the urls the probes can't be joined onto, like a bad port.
+    if Url.parse(url).query is not None:
+        raise ValueError(
+            f"url {url} has a query, the probes cannot be joined onto it."
         )
+    return url
 
-        check_readme(url, component)
-        check_license(url, component)
-        check_changelog(url, component)
-        check_mainfest(url, component)
-        check_index(url, component)
-
-        if index_of(url, "/components/" + component + "/"):
-            print(
-                "\t [green]Explorable Directory \t > "
-                + url
-                + "/components/"
-                + component
-                + "/"
-            )
 
-        if index_of(url, "/administrator/components/" + component + "/"):
-            print(
-                "\t [green]Explorable Directory \t > "
-                + url
-                + "/administrator/components/"
-                + component
-                + "/"
-            )
+def check_site(transport: Transport) -> bool:
+    """Checks how the target answers HEAD, calibrates the soft-404 signature,
+    runs the site-wide checks (robots, error log and Joomla version), checks
+    whether the target's paths are case-insensitive and returns whether the
+    target answered at all."""
+    url = escape(transport.url)
+    if not check_url(transport):
+        return False
 
-    elif check_url(url, "/components/" + component + "/") == 200:
-        print(
-            "[green]Component found: "
-            + component
-            + "\t > "
-            + url
-            + "/index.php?option="
-            + component
+    seed = transport.archive.seed if transport.archive else None
+    transport.head_probes = supports_head(transport, seed)
+    if not transport.head_probes:
+        notice(
+            transport,
+            f"[yellow]{url} doesn't answer HEAD like GET, existence probes "
+            f"read up to {EXISTS_BODY // 1024} KiB of each body instead",
         )
-        print("\t But possibly it is not active or protected")
-
-        check_readme(url, component)
-        check_license(url, component)
-        check_changelog(url, component)
-        check_mainfest(url, component)
-        check_index(url, component)
-
-        if index_of(url, "/components/" + component + "/"):
-            print(
-                "\t [green]Explorable Directory \t > "
-                + url
-                + "/components/"
-                + component
-                + "/"
+    transport.soft404 = calibrate(transport, seed)
+
+    if check_url(transport, "/robots.txt") == 200:
+        report(transport, "robots", "/robots.txt", status=200)
+    else:
+        notice(transport, "[red]No Robots file found on " + url)
+
+    if check_url(transport, "/error_log") == 200:
+        report(transport, "error_log", "/error_log", status=200)
+    else:
+        notice(transport, "[red]No Error Log found on " + url)
+
+    # Go through the versions and check
+    for version in VERSION_PATHS:
+        # If it resolves, check the version
+        if check_url(transport, version) == 200:
+            page_content = transport.get(version, need_body=True).text
+            lines = [
+                line
+                for line in page_content.split("\n")
+                if "version" in line.lower()
+            ]
+            report(
+                transport,
+                "version",
+                version,
+                status=200,
+                note="\n".join(lines),
             )
 
-        if index_of(url, "/administrator/components/" + component + "/"):
-            print(
-                "\t [green]Explorable Directory \t > "
-                + url
-                + "/administrator/components/"
-                + component
-                + "/"
-            )
+    # Files the checks above found, so only the swapped case is a new request.
+    known = ("/index.php", "/robots.txt", *VERSION_PATHS)
+    transport.case_insensitive = case_insensitive(transport, known, seed)
+    if transport.case_insensitive:
+        notice(
+            transport,
+            f"[yellow]{url} resolves paths case-insensitively, files are "
+            "probed in one case only",
+        )
 
-    elif check_url(url, "/administrator/components/" + component + "/") == 200:
+    return True
+
+
+def print_summary(transport: Transport, controller: Controller | None = None):
+    reused, opened = transport.metrics.connections()
+    cache = transport.cache
+    print(f"[blue]Connections: {reused} reused, {opened} opened")
+    print(
+        f"[blue]Cache: {cache.saved} requests saved "
+        f"({cache.hits} hits, {cache.coalesced} coalesced), {cache.misses} sent"
+    )
+    for line in transport.metrics.summary():
+        print(f"[blue]{line}")
+    if controller is not None:
+        print(f"[blue]Concurrency: {controller.summary()}")
+    if (errors := transport.breaker.summary()) is not None:
+        print(f"[red]Errors: {errors}")
+    if transport.limiter is not None:
+        limiter = transport.limiter
         print(
-            "[green]Component found: "
-            + component
-            + "\t > "
-            + url
-            + "/index.php?option="
-            + component
+            f"[blue]Rate limit: {limiter.rate:g} req/s per host and IP, "
+            f"{limiter.delayed} requests delayed"
         )
-        print("\t On the administrator components")
-
-        check_readme(url, component)
-        check_license(url, component)
-        check_changelog(url, component)
-        check_mainfest(url, component)
-        check_index(url, component)
-
-        if index_of(url, "/administrator/components/" + component + "/"):
-            print(
-                "\t [green]Explorable Directory \t > "
-                + url
-                + "/components/"
-                + component
-                + "/"
-            )
-
-        if index_of(url, "/administrator/components/" + component + "/"):
-            print(
-                "\t [green]Explorable Directory \t > "
-                + url
-                + "/administrator/components/"
-                + component
-                + "/"
-            )
+    if transport.archive is not None:
+        print(f"[blue]Archive: {transport.archive.summary()}")
 
 
 def scan(
-    url: str, user_agent: str, timeout: int = 5, threads: int = os.cpu_count()
+    url: str,
+    user_agent: str,
+    timeout: int = 5,
+    threads: int = os.cpu_count(),
+    engine: str = "threads",
+    limit: int = 1000,
+    enrich_threads: int | None = None,
+    components: list[str] | None = None,
+    history: History | None = None,
+    stop_after_misses: int | None = None,
+    adaptive: bool = False,
+    limiter: RateLimiter | None = None,
+    max_failures: int = 5,
+    journal: Journal | None = None,
+    findings: FindingWriter | None = None,
+    metrics: Metrics | None = None,
+    archive: Archive | None = None,
+    plan: Plan | None = None,
+    http2: bool = False,
 ):
-    global USER_AGENT, REQUEST_TIMEOUT
-    USER_AGENT = {"User-Agent": user_agent}
-    REQUEST_TIMEOUT = timeout
+    if components is None:
+        components = database().select()
+    if journal is None:
+        journal = Journal()
+    if enrich_threads is None:
+        enrich_threads = threads
+
+    # The pools and --limit become ceilings for the adaptive limit.
+    controller = None
+    if adaptive:
+        ceiling = limit if engine == "async" else threads + enrich_threads
+        controller = Controller(ceiling)
 
-    if not url.startswith("http://") and not url.startswith("https://"):
-        rich.print(f"[red] url {url} must have a scheme.")
+    try:
+        url = normalize_url(url)
+    except ValueError as e:
+        rich.print(f"[red] {e}")
         exit(1)
 
-    # Remove the ending to the url
-    if url.endswith("/"):
-        url = url[:-1]
-
-    if check_url(url):
-        if check_url(url, "/robots.txt") == 200:
-            print("[blue]Robots file found: \t \t > " + url + "/robots.txt")
-        else:
-            print("[red]No Robots file found")
-
-        if check_url(url, "/error_log") == 200:
-            print("[blue]Error log found: \t \t > " + url + "/error_log")
-        else:
-            print("[red]No Error Log found")
-
-        # Check if the version is present
-        version_paths = [
-            "/administrator/manifests/files/joomla.xml",
-            "/README.txt",
-        ]
-
-        # Go through the versions and check
-        for version in version_paths:
-            # If it resolves, check the version
-            if check_url(url, version) == 200:
+    with Transport(
+        url,
+        user_agent,
+        timeout,
+        pool_size=threads + enrich_threads,
+        controller=None if engine == "async" else controller,
+        limiter=limiter,
+        breaker=CircuitBreaker(url, max_failures),
+        metrics=metrics,
+        archive=archive,
+    ) as transport:
+        transport.journal = journal
+        transport.findings = findings
+        if plan is not None:
+            transport.plan = plan
+        if not check_site(transport):
+            reason = transport.breaker.summary() or "no answer"
+            notice(transport, f"[red]{escape(url)} did not answer: {reason}")
+            exit(1)
+
+        components = journal.remaining(url, components)
+        transport.probes.build(components)
+        notice(transport, "[green] Initiating component scans")
+        if engine == "async":
+            import asyncio
+
+            try:
+                from joom3y.aio import scan_async
+            except ImportError:
                 print(
-                    f"[green] Path {url + version} resolved, getting version string"
+                    "[red]The async engine needs httpx, install joom3y[async]."
                 )
-                page_content = requests.get(url + version).text
-                for line in page_content.split("\n"):
-                    if "version" in line.lower():
-                        print("\t", line)
-
-        print("[green] Initiating component scans")
-        with ThreadPoolExecutor(max_workers=threads) as executor:
-            futures = [
-                executor.submit(scanner, url, component)
-                for component in COMPONENTS
-            ]
-            # Wrap as_completed with track to update the progress bar as tasks complete.
-            for future in track(as_completed(futures), total=len(futures)):
-                # Optionally, process result or catch exceptions here.
-                future.result()
+                exit(1)
+            if http2 and find_spec("h2") is None:
+                print("[red]--http2 needs h2, install joom3y[http2].")
+                exit(1)
+
+            asyncio.run(
+                scan_async(
+                    url,
+                    user_agent,
+                    components,
+                    timeout,
+                    limit,
+                    transport.soft404,
+                    transport.cache,
+                    history,
+                    stop_after_misses,
+                    controller,
+                    limiter,
+                    transport.breaker,
+                    journal,
+                    findings,
+                    transport.metrics,
+                    archive,
+                    transport.plan,
+                    transport.head_probes,
+                    transport.case_insensitive,
+                    http2,
+                )
+            )
+        else:
+            scan_components(
+                transport,
+                components,
+                threads,
+                enrich_threads,
+                history,
+                stop_after_misses,
+            )
+
+        if findings is not None:
+            findings.wait()
+        print_summary(transport, controller)
@@ -0,0 +1,150 @@
+"""A checkpoint journal of a scan, so an interrupted scan can be resumed. It
+is an append-only file of tab-separated records, one per line:
+
+    probe    url    path         status
+    done     url    component    found
+
+A probe record is the outcome of one check_url, which a resumed scan answers
+from the journal instead of sending it again. A done record marks a component
+whose presence probes and, when it was found, enrichment probes have all
+finished, and a resumed scan skips it. Writes are flushed and fsynced in
+batches, and a torn last line is ignored when the journal is read back."""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+from rich import print
+
+# A batch is fsynced once it holds this many records, or is this old.
+SYNC_RECORDS = 64
+SYNC_INTERVAL = 1.0
+
+
+class Journal:
+    """The journal of a scan.
+
+    Args:
+        path (Path | None): The journal file, or None to keep no journal.
+        resume (bool): Whether to read the records already in the file and
+            append to it, rather than starting it over.
+    """
+
+    def __init__(self, path: Path | None = None, resume: bool = False):
+        self.path = path
+        self.probes: dict[tuple[str, str], int] = {}
+        self.done: dict[tuple[str, str], bool] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+        if path is None:
+            return
+        if resume and path.exists():
+            self._load(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a" if resume else "w")
+
+    def _load(self, path: Path):
+        with open(path) as f:
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                if not line.endswith("\n") or len(fields) != 4:
+                    continue
+                kind, url, key, value = fields
+                if kind == "probe":
+                    self.probes[url, key] = int(value)
+                elif kind == "done":
+                    self.done[url, key] = value == "1"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _append(self, *fields):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write("\t".join(fields) + "\n")
+            self._unsynced += 1
+            if (
+                self._unsynced >= SYNC_RECORDS
+                or time.monotonic() - self._synced_at >= SYNC_INTERVAL
+            ):
+                self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def outcome(self, url: str, path: str) -> int | None:
+        """The status a probe got before the scan was resumed, if any."""
+        return self.probes.get((url, path))
+
+    def probe(self, url: str, path: str, status: int):
+        self._append("probe", url, path, str(status))
+
+    def complete(self, url: str, component: str, found: bool):
+        self._append("done", url, component, "1" if found else "0")
+
+    def remaining(self, url: str, components: list[str]) -> list[str]:
+        """Returns the components not yet done on url, and prints what was
+        found before the scan was resumed."""
+        found = [c for c in components if self.done.get((url, c))]
+        left = [c for c in components if (url, c) not in self.done]
+        if len(left) < len(components):
+            print(
+                f"[blue]Resuming {url}: {len(components) - len(left)} "
+                f"components already scanned, found: "
+                f"{', '.join(found) or 'none'}"
+            )
+        return left
+
+    def close(self):
+        if self._file is None:
+            return
+        with self._lock:
+            self._sync()
+            self._file.close()
+            self._file = None
+
+
+class Pending:
+    """The outstanding enrichment probes of a found component, which is
+    journaled as done when the last of them has finished.
+
+    Args:
+        journal (Journal): The scan's journal.
+        url (str): The target.
+        component (str): The found component.
+        count (int): The number of enrichment probes.
+    """
+
+    def __init__(self, journal: Journal, url: str, component: str, count: int):
+        self.journal = journal
+        self.url = url
+        self.component = component
+        self.count = count
+        self._lock = threading.Lock()
+        if not count:
+            journal.complete(url, component, True)
+
+    def callback(self, future):
+        """A done callback for the future of a probe. A probe that was
+        cancelled or raised is not finished, so neither is the component."""
+        if not future.cancelled() and future.exception() is None:
+            self.finish()
+
+    def finish(self):
+        """Records that one of the probes finished."""
+        with self._lock:
+            self.count -= 1
+            if self.count:
+                return
+        self.journal.complete(self.url, self.component, True)
@@ -0,0 +1,259 @@
+"""Directory listing detection and harvesting. The body is fed in chunks and
+inspected as it arrives, stopping at the end of the <title> or after a byte
+cap, so a large component page is neither downloaded in full nor parsed into
+a tree. A listing that is one is read in full and its links, and those of
+its subdirectories, a bounded number of levels down, make up the inventory
+of the files in the tree, which answers the blind artifact probes of the
+directories it lists."""
+
+import html
+import re
+import threading
+from collections import deque
+from concurrent.futures import Future
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, Callable, NamedTuple
+from urllib.parse import unquote, urljoin, urlsplit
+
+if TYPE_CHECKING:
+    import asyncio
+
+# How much of a body is read before giving up on finding a listing.
+MAX_BYTES = 4096
+# How much of a listing is read. A longer one is only partly inventoried.
+MAX_LISTING_BYTES = 256 * 1024
+# How many levels of subdirectories a harvest reads below a listing, and how
+# many subdirectory listings it reads in all.
+MAX_DEPTH = 2
+MAX_LISTINGS = 8
+
+# Apache, nginx and lighttpd title their listings "Index of /path".
+INDEX_OF = re.compile(r"\bindex of /", re.IGNORECASE)
+# IIS titles its listings "host - /path/".
+IIS_TITLE = re.compile(r"^\S+ - /")
+IIS_PARENT = b"[to parent directory]"
+
+
+class ListingDetector:
+    """Decides whether a body is a directory listing from as little of it as
+    possible. feed() returns the verdict as soon as it is known, or None when
+    it needs more of the body, and close() returns it for a body that ended
+    early.
+
+    Args:
+        max_bytes (int): The number of bytes after which the verdict is made
+            on what was read.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._head = bytearray()
+
+    def feed(self, chunk: bytes) -> bool | None:
+        self._head += chunk[: self.max_bytes - len(self._head)]
+        lower = bytes(self._head).lower()
+
+        start = lower.find(b"<title")
+        if start != -1:
+            start = lower.find(b">", start)
+            end = lower.find(b"</title>", start)
+            if start != -1 and end != -1:
+                return self._judge(self._head[start + 1 : end], lower)
+
+        if IIS_PARENT in lower:
+            return True
+        if len(self._head) >= self.max_bytes:
+            return False
+        return None
+
+    def close(self) -> bool:
+        return bool(self.feed(b""))
+
+    def _judge(self, raw_title: bytes, lower: bytes) -> bool:
+        title = html.unescape(raw_title.decode("utf-8", "replace")).strip()
+        return bool(
+            INDEX_OF.search(title)
+            or IIS_TITLE.match(title)
+            or IIS_PARENT in lower
+        )
+
+
+class _Links(HTMLParser):
+    """Collects the hrefs of the anchors of a page."""
+
+    def __init__(self):
+        super().__init__()
+        self.hrefs = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            self.hrefs += [
+                value for name, value in attrs if name == "href" and value
+            ]
+
+
+def entries(
+    directory: str, body: bytes, location: str | None = None
+) -> tuple[list[str], list[str], bool]:
+    """The files and the subdirectories a listing of directory links to, as
+    paths, and whether some of its links led out of it. The links resolve
+    against location, the path the listing was read from, which is longer
+    than directory on a site installed below the root. Sort links, the
+    parent directory and links out of directory are left out, whether the
+    links are relative, as on Apache and nginx, or absolute, as on IIS."""
+    location = location or directory
+    links = _Links()
+    links.feed(body.decode("utf-8", "replace"))
+    links.close()
+
+    files, directories, astray = {}, {}, False
+    for href in links.hrefs:
+        parts = urlsplit(urljoin(location, href))
+        path = unquote(parts.path)
+        # The directory itself and the ones up the tree, like the parent.
+        if parts.query or path.endswith("/") and location.startswith(path):
+            continue
+        if not path.startswith(location):
+            astray = True
+            continue
+        name = path[len(location) :]
+        if "/" in name.rstrip("/"):
+            continue
+        if name.endswith("/"):
+            directories[directory + name] = None
+        else:
+            files[directory + name] = None
+    return list(files), list(directories), astray
+
+
+class Inventory(NamedTuple):
+    """The files of a harvested directory tree, and the directories of it
+    whose listings were read in full, which are the ones it can tell a file
+    is missing from, and the length of the listing read of the tree's root."""
+
+    files: frozenset[str]
+    listed: frozenset[str]
+    size: int = 0
+
+    def covers(self, path: str) -> bool:
+        return path[: path.rfind("/") + 1] in self.listed
+
+    def has(self, path: str, fold_case: bool = False) -> bool:
+        if path in self.files:
+            return True
+        if fold_case:
+            path = path.lower()
+            return any(file.lower() == path for file in self.files)
+        return False
+
+
+class Harvest:
+    """Builds the inventory of a listed directory tree breadth first, from
+    the listings the caller reads: next() names the next subdirectory to
+    read, or None when the harvest is done, and add() takes its body, or
+    None when it isn't a listing.
+
+    Args:
+        directory (str): The listed directory.
+        body (bytes): Its listing.
+        url (Callable[[str], str] | None): Joins a directory onto the url
+            of the target, giving where its listing is read from.
+        max_depth (int): The levels of subdirectories read below directory.
+        max_listings (int): The subdirectory listings read in all.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        body: bytes,
+        url: Callable[[str], str] | None = None,
+        max_depth: int = MAX_DEPTH,
+        max_listings: int = MAX_LISTINGS,
+    ):
+        self.url = url
+        self.max_depth = max_depth
+        self.reads = max_listings
+        self.size = len(body)
+        self.files = set()
+        self.listed = set()
+        self._queue = deque()
+        self._current = None
+        self._parse(directory, body, 0)
+
+    def _parse(self, directory: str, body: bytes, depth: int):
+        location = None
+        if self.url is not None:
+            location = unquote(urlsplit(self.url(directory)).path)
+        files, directories, astray = entries(directory, body, location)
+        # A listing whose links all lead elsewhere can't tell a file is
+        # missing, its links were resolved against the wrong path.
+        resolved = files or directories or not astray
+        if resolved and len(body) <= MAX_LISTING_BYTES:
+            self.listed.add(directory)
+        self.files.update(files)
+        if depth < self.max_depth:
+            self._queue.extend((path, depth + 1) for path in directories)
+
+    def next(self) -> str | None:
+        if not self._queue or not self.reads:
+            return None
+        self.reads -= 1
+        self._current = self._queue.popleft()
+        return self._current[0]
+
+    def add(self, body: bytes | None):
+        if body is not None:
+            directory, depth = self._current
+            self._parse(directory, body, depth)
+
+    def inventory(self) -> Inventory:
+        return Inventory(
+            frozenset(self.files), frozenset(self.listed), self.size
+        )
+
+
+class Inventories:
+    """The inventories of the listed directories of a target, each harvested
+    once. Probes asking for one while it is harvested wait for it, and a
+    harvest that failed answers None, so they fall back to probing."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._harvests: dict[str, "Future | asyncio.Future"] = {}
+
+    def get(self, directory: str, harvest) -> Inventory | None:
+        """Returns the inventory of directory, calling harvest() for it
+        when nobody has."""
+        with self._lock:
+            pending = self._harvests.get(directory)
+            if pending is None:
+                self._harvests[directory] = owned = Future()
+        if pending is not None:
+            return pending.result()
+
+        inventory = None
+        try:
+            inventory = harvest()
+        finally:
+            owned.set_result(inventory)
+        return inventory
+
+    async def get_async(self, directory: str, harvest) -> Inventory | None:
+        """The asyncio counterpart of get, harvest is a coroutine function."""
+        import asyncio
+
+        with self._lock:
+            pending = self._harvests.get(directory)
+            if pending is None:
+                self._harvests[directory] = owned = (
+                    asyncio.get_running_loop().create_future()
+                )
+        if pending is not None:
+            return await pending
+
+        inventory = None
+        try:
+            inventory = await harvest()
+        finally:
+            owned.set_result(inventory)
+        return inventory
@@ -0,0 +1,276 @@
+"""Performance metrics of a scan: request latency histograms per probe kind,
+throughput, bytes received and saved, status codes, timeouts and connection
+reuse. The kinds follow the requests: "head" and "get" for existence probes,
+calibration and get_content_length, and "stream" for directory listings.
+Bytes saved are the bodies the existence probes didn't download, as far as
+their Content-Length tells. Protocols count the HTTP versions the async
+engine's responses came over, to tell whether --http2 got HTTP/2, case
+variants the enrichment probes that case-insensitive targets were spared,
+and listed the probes answered from a directory listing instead. The metrics
+are printed at the end of a scan and can be written as a Prometheus textfile
+for node_exporter's textfile collector, to tell whether a slow cron run was
+the target, the network or the tool."""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+
+# Upper bounds of the latency buckets, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """A latency histogram with Prometheus buckets.
+
+    Args:
+        buckets (tuple[float, ...]): The upper bounds of the buckets.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile by interpolating in its bucket, as
+        Prometheus' histogram_quantile does."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                low = self.buckets[i - 1] if i else 0.0
+                return low + (self.buckets[i] - low) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class Metrics:
+    """The metrics of a scan, shared by all of its transports."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.latency: dict[str, Histogram] = {}
+        self.statuses: Counter[int] = Counter()
+        self.protocols: Counter[str] = Counter()
+        self.received = 0
+        self.saved = 0
+        self.folded = 0
+        self.listed = 0
+        self.timeouts = 0
+        self.errors = 0
+        # The connection pool counters of the transports, see PoolStats.
+        self.pools = []
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        kind: str,
+        latency: float,
+        status: int | None = None,
+        received: int = 0,
+        timeout: bool = False,
+        protocol: str | None = None,
+    ):
+        """Records a request, with its status or None when it failed, and
+        the HTTP version of its response when the transport knows it."""
+        with self._lock:
+            histogram = self.latency.get(kind)
+            if histogram is None:
+                histogram = self.latency[kind] = Histogram()
+            histogram.observe(latency)
+            self.received += received
+            if protocol is not None:
+                self.protocols[protocol] += 1
+            if status is not None:
+                self.statuses[status] += 1
+            elif timeout:
+                self.timeouts += 1
+            else:
+                self.errors += 1
+
+    def add_received(self, size: int):
+        with self._lock:
+            self.received += size
+
+    def add_saved(self, size: int):
+        with self._lock:
+            self.saved += size
+
+    def add_folded(self, probes: int):
+        with self._lock:
+            self.folded += probes
+
+    def add_listed(self):
+        with self._lock:
+            self.listed += 1
+
+    @property
+    def requests(self) -> int:
+        return sum(histogram.count for histogram in self.latency.values())
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def connections(self) -> tuple[int, int]:
+        """The connections reused and opened by the pooled transports."""
+        return (
+            sum(pool.hits for pool in self.pools),
+            sum(pool.misses for pool in self.pools),
+        )
+
+    def summary(self) -> list[str]:
+        elapsed = self.elapsed
+        statuses = ", ".join(
+            f"{count} {status}"
+            for status, count in sorted(self.statuses.items())
+        )
+        lines = [
+            f"Requests: {self.requests} in {elapsed:.1f}s "
+            f"({self.requests / elapsed:.1f}/s), "
+            f"{self.received / 1024:.0f} KiB received, "
+            f"{self.saved / 1024:.0f} KiB saved by body-less probes, "
+            f"{self.timeouts} timeouts, {self.errors} other errors",
+            f"Statuses: {statuses or 'none'}",
+        ]
+        if self.folded:
+            lines.append(
+                f"Case variants: {self.folded} probes skipped on "
+                "case-insensitive targets"
+            )
+        if self.listed:
+            lines.append(
+                f"Listings: {self.listed} probes answered from directory "
+                "listings"
+            )
+        if self.protocols:
+            lines.append(
+                "Protocols: "
+                + ", ".join(
+                    f"{count} {protocol}"
+                    for protocol, count in self.protocols.most_common()
+                )
+            )
+        for kind, histogram in sorted(self.latency.items()):
+            lines.append(
+                f"Latency {kind}: p50 {histogram.quantile(0.5) * 1000:.0f}ms, "
+                f"p95 {histogram.quantile(0.95) * 1000:.0f}ms, "
+                f"mean {histogram.sum / histogram.count * 1000:.0f}ms "
+                f"over {histogram.count}"
+            )
+        return lines
+
+    def textfile(self) -> str:
+        """The metrics in the Prometheus text format."""
+        elapsed = self.elapsed
+        reused, opened = self.connections()
+        lines = [
+            "# HELP joom3y_request_duration_seconds Latency of the requests "
+            "of the scan by probe kind.",
+            "# TYPE joom3y_request_duration_seconds histogram",
+        ]
+        for kind, histogram in sorted(self.latency.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(
+                    f'joom3y_request_duration_seconds_bucket{{kind="{kind}",'
+                    f'le="{bound}"}} {cumulative}'
+                )
+            lines += [
+                f'joom3y_request_duration_seconds_bucket{{kind="{kind}",'
+                f'le="+Inf"}} {histogram.count}',
+                f'joom3y_request_duration_seconds_sum{{kind="{kind}"}} '
+                f"{histogram.sum}",
+                f'joom3y_request_duration_seconds_count{{kind="{kind}"}} '
+                f"{histogram.count}",
+            ]
+
+        lines += [
+            "# HELP joom3y_responses_total Responses by status code.",
+            "# TYPE joom3y_responses_total counter",
+        ]
+        lines += [
+            f'joom3y_responses_total{{status="{status}"}} {count}'
+            for status, count in sorted(self.statuses.items())
+        ]
+        if self.protocols:
+            lines += [
+                "# HELP joom3y_protocol_responses_total Responses by HTTP "
+                "version.",
+                "# TYPE joom3y_protocol_responses_total counter",
+            ]
+            lines += [
+                f'joom3y_protocol_responses_total{{protocol="{protocol}"}} '
+                f"{count}"
+                for protocol, count in sorted(self.protocols.items())
+            ]
+        for name, kind, value, description in (
+            (
+                "timeouts_total",
+                "counter",
+                self.timeouts,
+                "Requests timed out.",
+            ),
+            ("errors_total", "counter", self.errors, "Requests failed."),
+            ("received_bytes_total", "counter", self.received, "Body bytes."),
+            (
+                "saved_bytes_total",
+                "counter",
+                self.saved,
+                "Body bytes the existence probes didn't download.",
+            ),
+            (
+                "case_variants_skipped_total",
+                "counter",
+                self.folded,
+                "Case-variant probes skipped on case-insensitive targets.",
+            ),
+            (
+                "listed_probes_total",
+                "counter",
+                self.listed,
+                "Probes answered from directory listings.",
+            ),
+            ("scan_duration_seconds", "gauge", elapsed, "Scan duration."),
+            (
+                "requests_per_second",
+                "gauge",
+                self.requests / elapsed,
+                "Average request rate of the scan.",
+            ),
+            ("last_run_timestamp_seconds", "gauge", time.time(), "Scan end."),
+        ):
+            lines += [
+                f"# HELP joom3y_{name} {description}",
+                f"# TYPE joom3y_{name} {kind}",
+                f"joom3y_{name} {value}",
+            ]
+        lines += [
+            "# HELP joom3y_connections_total Pooled connection checkouts.",
+            "# TYPE joom3y_connections_total counter",
+            f'joom3y_connections_total{{state="reused"}} {reused}',
+            f'joom3y_connections_total{{state="opened"}} {opened}',
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path):
+        """Writes the textfile to a temporary file and renames it over the
+        old one, so node_exporter never reads a partial file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(self.textfile())
+        os.replace(tmp, path)
@@ -0,0 +1,146 @@
+"""Hit-probability ordering of components. Each component is scored by how
+likely it is to be installed: the popularity shipped in the component
+database is the prior, and the hits and misses of our own past scans, kept in
+a local history file, pull the score towards what we actually see. Scanning
+in score order finds most real components early, which is what makes --top
+and --stop-after-misses useful for triage."""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from rich import print
+
+from joom3y.components import database
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no flock, concurrent saves there may drop counts.
+    fcntl = None
+
+# How many scans the shipped popularity is worth against local history.
+PRIOR_WEIGHT = 10
+
+
+def default_history_path() -> Path:
+    state = os.environ.get("XDG_STATE_HOME") or Path.home() / ".local/state"
+    return Path(state) / "joom3y" / "history.tsv"
+
+
+class History:
+    """Per-component scan and hit counts, stored as name, scans and hits
+    separated by tabs, one component per line. Scans running at the same
+    time share the file: each adds the counts it recorded to the file as it
+    is when it saves.
+
+    Args:
+        path (Path | None): The history file, or None to keep it in memory.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.counts: dict[str, list[int]] = {}
+        # The counts recorded since the file was read.
+        self._recorded: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+        if path is not None:
+            self.counts = self._read()
+
+    def _read(self) -> dict[str, list[int]]:
+        counts = {}
+        if self.path.exists():
+            for line in self.path.read_text().splitlines():
+                name, scans, hits = line.split("\t")
+                counts[name] = [int(scans), int(hits)]
+        return counts
+
+    def record(self, component: str, hit: bool):
+        with self._lock:
+            for counts in (self.counts, self._recorded):
+                component_counts = counts.setdefault(component, [0, 0])
+                component_counts[0] += 1
+                component_counts[1] += hit
+
+    def save(self):
+        """Adds the recorded counts to the file under an exclusive lock, and
+        writes them to a temporary file renamed over the old one, so an
+        interrupted save never leaves a truncated file. A failed save is
+        reported and doesn't raise, the scan's results come first."""
+        if self.path is None:
+            return
+
+        tmp = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with (
+                open(self.path.with_suffix(".lock"), "w") as lock,
+                self._lock,
+            ):
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                counts = self._read()
+                for name, (scans, hits) in self._recorded.items():
+                    component_counts = counts.setdefault(name, [0, 0])
+                    component_counts[0] += scans
+                    component_counts[1] += hits
+                with tempfile.NamedTemporaryFile(
+                    "w",
+                    dir=self.path.parent,
+                    prefix=self.path.name + ".",
+                    suffix=".tmp",
+                    delete=False,
+                ) as f:
+                    tmp = f.name
+                    f.write(
+                        "".join(
+                            f"{name}\t{scans}\t{hits}\n"
+                            for name, (scans, hits) in sorted(counts.items())
+                        )
+                    )
+                os.replace(tmp, self.path)
+                tmp = None
+                self.counts, self._recorded = counts, {}
+        except OSError as e:
+            print(f"[red]Could not save the scan history to {self.path}: {e}")
+        finally:
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+
+    def score(self, component: str, popularity: int) -> float:
+        scans, hits = self.counts.get(component, (0, 0))
+        prior = popularity / 100
+        return (hits + PRIOR_WEIGHT * prior) / (scans + PRIOR_WEIGHT)
+
+
+def rank(components: list[str], history: History) -> list[str]:
+    """Orders components by descending score. Ties keep their order."""
+    db = database()
+
+    def score(name):
+        record = db.get(name)
+        return history.score(name, record.popularity if record else 0)
+
+    return sorted(components, key=score, reverse=True)
+
+
+class MissStreak:
+    """Counts consecutive presence misses, to stop a scan once the likely
+    components have been tried and only unlikely ones keep missing.
+
+    Args:
+        limit (int | None): The number of misses in a row that stops the
+            scan, or None to never stop.
+    """
+
+    def __init__(self, limit: int | None = None):
+        self.limit = limit
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hit: bool) -> bool:
+        """Records a presence result and returns whether to stop."""
+        with self._lock:
+            self.misses = 0 if hit else self.misses + 1
+            return self.limit is not None and self.misses >= self.limit
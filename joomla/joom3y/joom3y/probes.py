@@ -0,0 +1,242 @@
+"""The probe paths of a component and the probe urls of a target. Paths are
+the same on every target, so the presence probes of a component are built
+once per scan and interned, and each target joins them onto its base url
+once, in a ProbeTable, instead of concatenating on every request. The
+enrichment probes are data, TEMPLATES, compiled once per scan into a Plan of
+the selected kinds (--artifacts), with a case-folded variant of each for
+targets that resolve paths case-insensitively."""
+
+import sys
+from functools import cache
+from typing import NamedTuple
+
+from joom3y.calibrate import SAMPLES
+from joom3y.components import database
+from joom3y.url import Url
+
+
+# The enrichment probes of a found component as data: path templates by the
+# kind of artifact they look for. {site} and {admin} are the component's
+# directories and {name} its name without the com_ prefix. Besides these,
+# "artifact" probes the paths the component database knows for it, and
+# "listing" checks the directories the presence probes pointed at for a
+# directory listing. "index" files are also checked for their size.
+TEMPLATES = {
+    "readme": (
+        "{site}README.txt",
+        "{site}readme.txt",
+        "{site}README.md",
+        "{site}readme.md",
+        "{admin}README.txt",
+        "{admin}readme.txt",
+        "{admin}README.md",
+        "{admin}readme.md",
+    ),
+    "license": (
+        "{site}LICENSE.txt",
+        "{site}license.txt",
+        "{admin}LICENSE.txt",
+        "{admin}license.txt",
+        "{site}{name}.xml",
+        "{admin}{name}.xml",
+    ),
+    "changelog": (
+        "{site}CHANGELOG.txt",
+        "{site}changelog.txt",
+        "{admin}CHANGELOG.txt",
+        "{admin}changelog.txt",
+    ),
+    "manifest": (
+        "{site}MANIFEST.xml",
+        "{site}manifest.xml",
+        "{admin}MANIFEST.xml",
+        "{admin}manifest.xml",
+    ),
+    "index": (
+        "{site}index.htm",
+        "{site}index.html",
+        "{admin}INDEX.htm",
+        "{admin}INDEX.html",
+    ),
+}
+KINDS = (
+    "readme",
+    "license",
+    "changelog",
+    "manifest",
+    "artifact",
+    "index",
+    "listing",
+)
+
+# The site-wide version files, probed once per target.
+VERSION_PATHS = ("/administrator/manifests/files/joomla.xml", "/README.txt")
+
+
+def artifact_paths(component):
+    """The extra artifacts the component database knows for a component."""
+    record = database().get(component)
+    if record is None:
+        return []
+    return [
+        directory + component + "/" + artifact
+        for artifact in record.artifacts
+        for directory in ("/components/", "/administrator/components/")
+    ]
+
+
+@cache
+def presence_probes(component):
+    """The presence checks for a component in the order they are tried. Each
+    entry holds the path to probe, the note printed when it is the one that
+    hits, and the directories worth checking for a listing afterwards."""
+    site = sys.intern("/components/" + component + "/")
+    admin = sys.intern("/administrator/components/" + component + "/")
+    return (
+        (sys.intern("/index.php?option=" + component), None, (site, admin)),
+        (site, "But possibly it is not active or protected", (site, admin)),
+        (admin, "On the administrator components", (admin,)),
+    )
+
+
+class ProbeTable:
+    """The urls of the probes sent to a target, by path. The presence probes
+    of the scanned components are joined onto the target url up front, and
+    any other path on first use.
+
+    Args:
+        url (str): The base url of the target, without a trailing slash.
+    """
+
+    def __init__(self, url: str):
+        self.base = Url.parse(url)
+        self._urls: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def build(self, components):
+        for component in components:
+            for path, _, _ in presence_probes(component):
+                self.url(path)
+
+    def url(self, path: str) -> str:
+        url = self._urls.get(path)
+        if url is None:
+            # Racing threads may both join a path, either result is right.
+            url = self._urls[path] = sys.intern(str(self.base + path))
+        return url
+
+
+class Step(NamedTuple):
+    kind: str
+    path: str
+
+
+class Plan:
+    """The enrichment probes of a scan, compiled from TEMPLATES into one flat
+    array of steps for the selected kinds, with templates shared by two kinds
+    probed once. The folded steps keep one template of those that differ only
+    by case, for case-insensitive targets.
+
+    Args:
+        kinds (list[str] | None): The kinds of artifact to probe for, all of
+            KINDS when None.
+
+    Raises:
+        ValueError: When a kind is not one of KINDS.
+    """
+
+    def __init__(self, kinds: list[str] | None = None):
+        if kinds is None:
+            kinds = KINDS
+        unknown = [kind for kind in kinds if kind not in KINDS]
+        if unknown:
+            raise ValueError(
+                f"Unknown artifact kinds {', '.join(unknown)}, "
+                f"pick from {', '.join(KINDS)}."
+            )
+
+        self.kinds = tuple(kind for kind in KINDS if kind in kinds)
+        seen = set()
+        steps = []
+        for kind in self.kinds:
+            for template in TEMPLATES.get(kind, ()):
+                if template not in seen:
+                    seen.add(template)
+                    steps.append(Step(kind, template))
+        self.steps = tuple(steps)
+        seen = set()
+        folded = []
+        for step in steps:
+            if step.path.lower() not in seen:
+                seen.add(step.path.lower())
+                folded.append(step)
+        self.folded_steps = tuple(folded)
+
+    def expand(
+        self, component: str, listings=(), fold_case: bool = False
+    ) -> list[Step]:
+        """The enrichment probes of a found component, each path once, or
+        each path once whatever its case with fold_case."""
+        fields = {
+            "site": "/components/" + component + "/",
+            "admin": "/administrator/components/" + component + "/",
+            "name": component[4:],
+        }
+        probes = [
+            Step(kind, template.format_map(fields))
+            for kind, template in (
+                self.folded_steps if fold_case else self.steps
+            )
+        ]
+        if "artifact" in self.kinds:
+            probes += [
+                Step("artifact", path) for path in artifact_paths(component)
+            ]
+
+        seen = set()
+        unique = []
+        for probe in probes:
+            key = probe.path.lower() if fold_case else probe.path
+            if key not in seen:
+                seen.add(key)
+                unique.append(probe)
+        if "listing" in self.kinds:
+            unique += [Step("listing", path) for path in listings]
+        return unique
+
+    def requests(self, component: str, fold_case: bool = False) -> int:
+        """The most requests a found component can take, presence included.
+        Its listing directories are the presence probes' own, so they come
+        from the cache, and index files that exist add a HEAD each."""
+        probes = self.expand(component, fold_case=fold_case)
+        return len(presence_probes(component)) + sum(
+            2 if probe.kind == "index" else 1 for probe in probes
+        )
+
+    def folds(self, component: str) -> int:
+        """The probes of a found component that differ from others only by
+        case, which case-insensitive targets are spared."""
+        return len(self.expand(component)) - len(
+            self.expand(component, fold_case=True)
+        )
+
+    def summary(self, components: list[str]) -> list[str]:
+        """The request counts of a scan of components with this plan, per
+        target, for a --plan dry run."""
+        # The home page, the calibration samples, the HEAD and case checks,
+        # robots.txt, error_log and the version files.
+        site = 1 + 3 * SAMPLES + 4 + 2 + 2 + len(VERSION_PATHS)
+        presence = sum(len(presence_probes(c)) for c in components)
+        everything = sum(self.requests(c) for c in components)
+        folded = sum(self.requests(c, fold_case=True) for c in components)
+        return [
+            f"Artifacts: {', '.join(self.kinds) or 'none'}, "
+            f"{len(self.steps)} templates",
+            f"Components: {len(components)}",
+            f"Site checks: up to {site} requests",
+            f"Nothing installed: {site + presence} requests at most",
+            f"Everything installed: {site + everything} requests at most, "
+            f"{site + folded} on a case-insensitive target",
+        ]
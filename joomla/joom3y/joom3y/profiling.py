@@ -0,0 +1,58 @@
+"""CPU profiling of a whole scan. python -m cProfile only sees the main thread,
+which mostly waits on the worker pools, so --profile installs a profiler in
+every thread the scan starts and merges them into one pstats file.
+
+Before Python 3.12 profilers are per thread, and threading.setprofile starts
+one in each new thread. From 3.12 on cProfile hooks into sys.monitoring,
+whose events are global to the interpreter, so the single profiler started
+in the main thread already sees the calls of every thread (and only one can
+be active at a time)."""
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+from pathlib import Path
+
+PER_THREAD = sys.version_info < (3, 12)
+
+
+class Profiler:
+    """The profilers of the main thread and of the threads started while it
+    runs."""
+
+    def __init__(self):
+        self.profiles: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def _start_thread(self, *_):
+        # Called with the first event of a new thread, the profiler then
+        # replaces this hook for the rest of the thread.
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+        profile.enable()
+
+    def start(self):
+        if PER_THREAD:
+            threading.setprofile(self._start_thread)
+        self._start_thread()
+
+    def stop(self) -> pstats.Stats:
+        """Stops profiling and returns the merged stats of every thread."""
+        threading.setprofile(None)
+        self.profiles[0].disable()
+        with self._lock:
+            return pstats.Stats(*self.profiles)
+
+    def save(self, path: Path, top: int = 20) -> str:
+        """Stops profiling, writes the merged stats to path and returns a
+        report of the top functions by their own time."""
+        stats = self.stop()
+        stats.dump_stats(path)
+
+        report = io.StringIO()
+        stats.stream = report
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+        return report.getvalue()
@@ -0,0 +1,87 @@
+"""Request rate limits per hostname and per resolved IP, so many vhosts on one
+box share a single budget. Each key has a token bucket, kept as the
+theoretical arrival time of the next request (the GCRA form of a token
+bucket). A request reserves its send time in both of its buckets at once,
+under one lock, and the caller sleeps until then, so nothing spins and no
+bucket is ever exceeded."""
+
+import socket
+import threading
+import time
+
+
+class TokenBucket:
+    """A bucket refilling at rate tokens per second and holding at most burst
+    tokens."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.interval = 1 / rate
+        self.tolerance = self.interval * (max(1, burst) - 1)
+        self.tat = 0.0
+
+    def earliest(self, now: float) -> float:
+        """The earliest time at or after now that a token is available."""
+        return max(now, self.tat - self.tolerance)
+
+    def take(self, at: float):
+        self.tat = max(self.tat, at) + self.interval
+
+
+class RateLimiter:
+    """Token buckets keyed by hostname and by the IP it resolves to, shared
+    by every transport of a scan.
+
+    Args:
+        rate (float): The requests per second allowed to one host or IP.
+        burst (int): The requests allowed back to back before the rate
+            applies.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.delayed = 0
+        self._lock = threading.Lock()
+        self._buckets: dict[str, TokenBucket] = {}
+        self._addresses: dict[tuple[str, int], str | None] = {}
+
+    def resolve(self, host: str, port: int) -> str | None:
+        """Returns the IP host resolves to, looked up once per scan."""
+        key = (host, port)
+        if key not in self._addresses:
+            try:
+                # An IPv6 host comes in the brackets of its url.
+                info = socket.getaddrinfo(
+                    host.strip("[]"), port, type=socket.SOCK_STREAM
+                )
+                self._addresses[key] = info[0][4][0]
+            except OSError:
+                self._addresses[key] = None
+        return self._addresses[key]
+
+    def _bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    def reserve(self, host: str, port: int) -> float:
+        """Reserves a request to host and returns how long to sleep before
+        sending it."""
+        ip = self.resolve(host, port)
+        with self._lock:
+            buckets = [self._bucket("host:" + host)]
+            if ip is not None and ip != host:
+                buckets.append(self._bucket("ip:" + ip))
+
+            now = time.monotonic()
+            at = max(bucket.earliest(now) for bucket in buckets)
+            for bucket in buckets:
+                bucket.take(at)
+            self.delayed += at > now
+        return at - now
+
+    def wait(self, host: str, port: int):
+        delay = self.reserve(host, port)
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,323 @@
+"""Scanning many targets in one process. Every probe of every target is a job
+on one shared set of worker threads, so --threads is a global budget, and the
+scheduler hands jobs out round-robin across hosts with a per-host cap so a
+slow site cannot hold all of the workers."""
+
+import sys
+import threading
+from collections import deque
+
+from rich import print
+from rich.markup import escape
+from rich.progress import Progress
+
+from joom3y.archive import Archive
+from joom3y.breaker import CircuitBreaker
+from joom3y.components import database
+from joom3y.controller import Controller
+from joom3y.findings import FindingWriter
+from joom3y.joom3y import (
+    check_site,
+    enrichment,
+    normalize_url,
+    presence,
+    settle,
+)
+from joom3y.journal import Journal, Pending
+from joom3y.metrics import Metrics
+from joom3y.priority import History, MissStreak
+from joom3y.probes import Plan
+from joom3y.ratelimit import RateLimiter
+from joom3y.transport import Transport
+from joom3y.url import Url
+
+
+def read_targets(path: str) -> list[str]:
+    """Reads one url per line from a file, or from stdin when path is "-".
+    Blank lines and lines starting with # are skipped."""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path) as f:
+            lines = f.read().splitlines()
+
+    return [
+        line.strip()
+        for line in lines
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+
+
+def host_key(url: str) -> str:
+    parsed = Url.parse(url)
+    if parsed.port is None:
+        return parsed.host
+    return f"{parsed.host}:{parsed.port}"
+
+
+class FairScheduler:
+    """A job queue per host, drained round-robin. A host with per_host jobs
+    running is skipped until one of them finishes, and next() blocks without
+    spinning until a job can be handed out or all work is done. Jobs are
+    queued as iterators, so a target's component jobs are only built as they
+    are handed out.
+
+    Args:
+        per_host (int): The maximum number of jobs running against one host.
+        cap (Callable[[str], int] | None): A tighter, changing cap per host,
+            such as an adaptive concurrency limit.
+    """
+
+    def __init__(self, per_host: int, cap=None):
+        self.per_host = per_host
+        self.cap = cap
+        self._cond = threading.Condition()
+        self._ring: deque[str] = deque()
+        self._pending: dict[str, deque] = {}
+        self._active: dict[str, int] = {}
+        self._running = 0
+
+    def submit(self, host: str, job):
+        self.extend(host, (job,))
+
+    def extend(self, host: str, jobs):
+        with self._cond:
+            if host not in self._pending:
+                self._pending[host] = deque()
+                self._ring.append(host)
+            self._pending[host].append(iter(jobs))
+            self._cond.notify_all()
+
+    def _pop(self, host: str):
+        queue = self._pending[host]
+        while queue:
+            job = next(queue[0], None)
+            if job is not None:
+                return job
+            queue.popleft()
+        del self._pending[host]
+        return None
+
+    def next(self):
+        """Returns the next (host, job) pair, or None once nothing is queued
+        or running."""
+        with self._cond:
+            while True:
+                for _ in range(len(self._ring)):
+                    host = self._ring.popleft()
+                    cap = self.per_host
+                    if self.cap is not None:
+                        cap = min(cap, self.cap(host))
+                    if self._active.get(host, 0) >= cap:
+                        self._ring.append(host)
+                        continue
+
+                    job = self._pop(host)
+                    if job is None:
+                        continue
+
+                    self._ring.append(host)
+                    self._active[host] = self._active.get(host, 0) + 1
+                    self._running += 1
+                    return host, job
+
+                if not self._ring and not self._running:
+                    self._cond.notify_all()
+                    return None
+                self._cond.wait()
+
+    def done(self, host: str):
+        with self._cond:
+            self._active[host] -= 1
+            if not self._active[host]:
+                del self._active[host]
+            self._running -= 1
+            self._cond.notify_all()
+
+
+class Target:
+    """A target and the number of its jobs still outstanding. The transport is
+    opened by the target's first job and closed and dropped, with its cache,
+    as soon as its last one is finished, so only targets being worked on
+    hold connections and responses."""
+
+    def __init__(self, url: str, host: str, streak: MissStreak):
+        self.url = url
+        self.host = host
+        self.streak = streak
+        self.stopped = False
+        self.transport: Transport | None = None
+        self.remaining = 1
+        self._lock = threading.Lock()
+
+    def add(self, count: int):
+        with self._lock:
+            self.remaining += count
+
+    def finish(self):
+        with self._lock:
+            self.remaining -= 1
+            if self.remaining:
+                return
+        if self.transport is not None:
+            self.transport.close()
+            self.transport.cache.clear()
+            self.transport = None
+
+
+def scan_targets(
+    urls: list[str],
+    user_agent: str,
+    timeout: int = 5,
+    threads: int = 10,
+    per_host: int = 4,
+    components: list[str] | None = None,
+    history: History | None = None,
+    stop_after_misses: int | None = None,
+    adaptive: bool = False,
+    limiter: RateLimiter | None = None,
+    max_failures: int = 5,
+    journal: Journal | None = None,
+    findings: FindingWriter | None = None,
+    metrics: Metrics | None = None,
+    archive: Archive | None = None,
+    plan: Plan | None = None,
+):
+    if components is None:
+        components = database().select()
+    if history is None:
+        history = History()
+    if journal is None:
+        journal = Journal()
+    if metrics is None:
+        metrics = Metrics()
+
+    # One adaptive limit per host, shared by the targets on it, which the
+    # scheduler also honours so workers don't block on a throttled host.
+    controllers: dict[str, Controller] = {}
+    # One circuit per host, so a dead box fails fast for all its vhosts.
+    breakers: dict[str, CircuitBreaker] = {}
+    scheduler = FairScheduler(
+        per_host, (lambda host: controllers[host].limit) if adaptive else None
+    )
+    targets = []
+    for url in urls:
+        try:
+            url = normalize_url(url)
+            host = host_key(url)
+            if adaptive and host not in controllers:
+                controllers[host] = Controller(per_host)
+            if host not in breakers:
+                breakers[host] = CircuitBreaker(host, max_failures)
+            streak = MissStreak(stop_after_misses)
+            targets.append(Target(url, host, streak))
+        except ValueError as e:
+            print(f"[red] {e}")
+
+    progress = Progress()
+    task = progress.add_task(
+        "Scanning", total=len(targets) * (1 + len(components))
+    )
+
+    def site_job(target: Target):
+        target.transport = Transport(
+            target.url,
+            user_agent,
+            timeout,
+            per_host,
+            controllers.get(target.host),
+            limiter,
+            breakers[target.host],
+            metrics,
+            archive,
+        )
+        target.transport.journal = journal
+        target.transport.findings = findings
+        if plan is not None:
+            target.transport.plan = plan
+        if not check_site(target.transport):
+            # Its errors are in the host's summary at the end.
+            print(f"[red]Skipping {escape(target.url)}, it did not answer")
+            progress.advance(task, len(components))
+            return
+        remaining = journal.remaining(target.url, components)
+        target.transport.probes.build(remaining)
+        progress.advance(task, len(components) - len(remaining))
+        target.add(len(remaining))
+        scheduler.extend(
+            target.host,
+            ((component_job, target, component) for component in remaining),
+        )
+
+    def component_job(target: Target, component: str):
+        # The rest of a stopped target's queue drains without requests.
+        if target.stopped:
+            return
+
+        found = presence(target.transport, component)
+        hit = settle(target.transport, history, journal, component, found)
+        if hit is None:
+            return
+        if target.streak.record(hit) and not target.stopped:
+            target.stopped = True
+            print(
+                f"[yellow]Stopping {target.url} after "
+                f"{target.streak.misses} misses in a row"
+            )
+        if not hit:
+            return
+
+        # Queue the enrichment probes behind the host's other jobs so they
+        # run in parallel under the same per-host cap.
+        note, listings = found
+        probes = enrichment(target.transport, component, listings)
+        pending = Pending(journal, target.url, component, len(probes))
+        target.add(len(probes))
+        scheduler.extend(
+            target.host,
+            (
+                (enrich_job, target, pending, check, args)
+                for check, args in probes
+            ),
+        )
+
+    def enrich_job(target: Target, pending: Pending, check, args):
+        check(target.transport, *args)
+        pending.finish()
+
+    for target in targets:
+        scheduler.submit(target.host, (site_job, target))
+
+    def worker():
+        while (item := scheduler.next()) is not None:
+            host, (job, target, *args) = item
+            try:
+                job(target, *args)
+            except Exception as e:
+                print(f"[red]error on {target.url}: {e}")
+            finally:
+                target.finish()
+                if job is not enrich_job:
+                    progress.advance(task)
+                scheduler.done(host)
+
+    print(f"[green] Scanning {len(targets)} targets")
+    with progress:
+        workers = [
+            threading.Thread(target=worker, daemon=True)
+            for _ in range(threads)
+        ]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    if findings is not None:
+        findings.wait()
+
+    for line in metrics.summary():
+        print(f"[blue]{line}")
+    if archive is not None:
+        print(f"[blue]Archive: {archive.summary()}")
+    for host, breaker in breakers.items():
+        if (errors := breaker.summary()) is not None:
+            print(f"[red]Errors on {host}: {errors}")
@@ -0,0 +1,381 @@
+import threading
+import time
+from contextlib import nullcontext
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from joom3y.archive import Archive, RecordedError
+from joom3y.breaker import CircuitBreaker
+from joom3y.cache import CachedResponse, ResponseCache
+from joom3y.calibrate import Soft404
+from joom3y.controller import Controller
+from joom3y.findings import FindingWriter
+from joom3y.journal import Journal
+from joom3y.listing import Inventories
+from joom3y.metrics import Metrics
+from joom3y.probes import Plan, ProbeTable
+from joom3y.ratelimit import RateLimiter
+
+# The failures that count towards opening the circuit of a host.
+CONNECTION_ERRORS = (requests.ConnectionError, requests.Timeout)
+# The most an existence GET reads of a body. Reading a small body to its end
+# keeps the connection for the next request, a larger one is cut off and
+# its connection closed.
+EXISTS_BODY = 16 * 1024
+
+
+def content_length(headers) -> int:
+    """The Content-Length of a response, 0 when it is missing or invalid."""
+    try:
+        return int(headers.get("content-length", 0))
+    except ValueError:
+        return 0
+
+
+class PoolStats:
+    """Thread-safe counters of connection checkouts from the pool. A hit is a
+    checkout that got an already-open keep-alive connection, a miss is one
+    that had to open a new TCP (and TLS) connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, reused: bool):
+        with self._lock:
+            if reused:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+def _counting_pool(pool_cls: type, stats: PoolStats) -> type:
+    class CountingPool(pool_cls):
+        def _get_conn(self, timeout=None):
+            conn = super()._get_conn(timeout)
+            # Fresh and reset connections have no socket until they connect.
+            stats.record(getattr(conn, "sock", None) is not None)
+            return conn
+
+    # Keep the original name, it shows up in connection error messages.
+    CountingPool.__name__ = CountingPool.__qualname__ = pool_cls.__name__
+    return CountingPool
+
+
+class PooledAdapter(HTTPAdapter):
+    """An HTTPAdapter whose connection pools report hits and misses."""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self.stats),
+            "https": _counting_pool(HTTPSConnectionPool, self.stats),
+        }
+
+
+class ReplayAdapter(BaseAdapter):
+    """An adapter answering requests from a recorded scan, see
+    joom3y.archive."""
+
+    def __init__(self, archive: Archive):
+        super().__init__()
+        self.archive = archive
+
+    def send(self, request, stream=False, timeout=None, **_):
+        try:
+            status, headers, body = self.archive.replay(
+                request.method, request.url
+            )
+        except RecordedError as e:
+            error = (
+                requests.ConnectTimeout
+                if e.timeout
+                else requests.ConnectionError
+            )
+            raise error(f"Recorded: {e}", request=request)
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        # The whole body is already read, streaming replays it in chunks.
+        response._content = body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+def request_url(response: requests.Response) -> str:
+    """The url of the request that led to a response, before redirects."""
+    first = response.history[0] if response.history else response
+    return first.request.url
+
+
+class Transport:
+    """The scan-scoped HTTP layer. Every probe against a target goes through a
+    single keep-alive session whose pool is sized to the number of workers, so
+    connections are reused instead of re-handshaking on each request, and
+    through a response cache, so a url is only fetched once.
+
+    Args:
+        url (str): The base url of the target, without a trailing slash.
+        user_agent (str): The User-Agent header sent with every request.
+        timeout (int): The per-request timeout, in seconds.
+        pool_size (int): The maximum number of pooled connections per host.
+        controller (Controller | None): The adaptive limit on requests in
+            flight, or None to leave concurrency to the worker pools.
+        limiter (RateLimiter | None): The scan's per-host and per-IP rate
+            limits, or None for no limit.
+        breaker (CircuitBreaker | None): The circuit of the target's host,
+            or None for one of its own.
+        metrics (Metrics | None): The scan's metrics, or None for metrics
+            of its own.
+        archive (Archive | None): The archive the scan records its traffic
+            to, or replays it from.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        user_agent: str,
+        timeout: int = 5,
+        pool_size: int = 10,
+        controller: Controller | None = None,
+        limiter: RateLimiter | None = None,
+        breaker: CircuitBreaker | None = None,
+        metrics: Metrics | None = None,
+        archive: Archive | None = None,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.controller = controller
+        self.limiter = limiter
+
+        self.probes = ProbeTable(url)
+        parsed = self.probes.base
+        self.host = parsed.host
+        self.port = parsed.port or (443 if parsed.scheme == "https://" else 80)
+        self.breaker = breaker if breaker is not None else CircuitBreaker(url)
+        self.stats = PoolStats()
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.metrics.pools.append(self.stats)
+        self.cache = ResponseCache()
+        # Set by calibration before the component scans.
+        self.soft404: Soft404 | None = None
+        # Set by the scan when it keeps a journal, writes its findings or
+        # probes a subset of the artifacts.
+        self.journal = Journal()
+        self.findings: FindingWriter | None = None
+        self.plan = Plan()
+        # Set by check_site when the target answers HEAD like GET, and when
+        # it resolves paths case-insensitively.
+        self.head_probes = False
+        self.case_insensitive = False
+        # The harvested directory listings of the target.
+        self.inventories = Inventories()
+        self.archive = archive
+        self.recording = archive if archive and not archive.replaying else None
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        if archive is not None and archive.replaying:
+            adapter = ReplayAdapter(archive)
+        else:
+            adapter = PooledAdapter(
+                self.stats, pool_connections=1, pool_maxsize=pool_size
+            )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def request(
+        self, method: str, path: str = "/", need_body: bool = False
+    ) -> CachedResponse:
+        """Sends a request through the scan's cache. HEADs follow redirects
+        like GETs, so a HEAD sees the status a GET would end on. need_body
+        refetches a cached response whose body was too large to keep, or was
+        never downloaded."""
+        url = self.probes.url(path)
+        return self.cache.fetch(
+            method,
+            url,
+            lambda: self._send(method, url, allow_redirects=True),
+            need_body,
+        )
+
+    def exists(self, path: str = "/") -> CachedResponse:
+        """The status and headers of path, downloading as little of its body
+        as possible: a HEAD when the target answers HEAD like GET, otherwise
+        a GET that reads at most EXISTS_BODY bytes. The body bytes left
+        behind are counted as saved."""
+        url = self.probes.url(path)
+        if self.head_probes:
+            return self.cache.fetch(
+                "HEAD", url, lambda: self._exists_head(url)
+            )
+        return self.cache.fetch("GET", url, lambda: self._exists_get(url))
+
+    def _exists_head(self, url: str) -> requests.Response:
+        response = self._send("HEAD", url, allow_redirects=True)
+        self.metrics.add_saved(content_length(response.headers))
+        return response
+
+    def _exists_get(self, url: str) -> CachedResponse:
+        with self._send("GET", url, kind="get", stream=True) as response:
+            chunks = []
+            read = 0
+            for chunk in response.iter_content(EXISTS_BODY):
+                chunks.append(chunk)
+                read += len(chunk)
+                if read > EXISTS_BODY:
+                    break
+            complete = read <= EXISTS_BODY
+            self.metrics.add_received(read)
+            if not complete:
+                self.metrics.add_saved(
+                    max(content_length(response.headers) - read, 0)
+                )
+            body = b"".join(chunks)
+            if self.recording:
+                self.recording.record(
+                    "GET",
+                    request_url(response),
+                    response.status_code,
+                    response.headers,
+                    body,
+                    redirected=bool(response.history),
+                    partial=not complete,
+                )
+            return CachedResponse(
+                response.status_code,
+                response.headers,
+                body if complete else None,
+                bool(response.history),
+            )
+
+    def _send(
+        self, method: str, url: str, kind: str | None = None, **kwargs
+    ) -> requests.Response:
+        """Sends a request on the session, or raises CircuitOpen while the
+        target's circuit is open. It holds a slot of the controller and waits
+        for the rate limiter, when there are ones, reports the outcome to the
+        breaker, the controller and the metrics under kind, and records it
+        when the scan is recorded. Streamed responses are recorded by their
+        readers."""
+        self.breaker.allow()
+        streamed = kwargs.get("stream", False)
+        if kind is None:
+            kind = "stream" if streamed else method.lower()
+        controller = self.controller
+        with controller.slot() if controller else nullcontext():
+            if self.limiter is not None:
+                self.limiter.wait(self.host, self.port)
+
+            start = time.perf_counter()
+            try:
+                response = self.session.request(
+                    method, url, timeout=self.timeout, **kwargs
+                )
+            except BaseException as e:
+                latency = time.perf_counter() - start
+                timeout = isinstance(e, requests.Timeout)
+                self.breaker.failure(e, isinstance(e, CONNECTION_ERRORS))
+                if self.recording and isinstance(e, CONNECTION_ERRORS):
+                    request = e.request
+                    self.recording.record_error(
+                        method, request.url if request else url, timeout
+                    )
+                if isinstance(e, Exception):
+                    self.metrics.record(kind, latency, timeout=timeout)
+                if controller:
+                    controller.record(latency, timeout=timeout)
+                raise
+
+            latency = time.perf_counter() - start
+            self.breaker.success()
+            self.metrics.record(
+                kind,
+                latency,
+                response.status_code,
+                0 if streamed else len(response.content),
+            )
+            if controller:
+                controller.record(
+                    latency,
+                    response.status_code,
+                    response.headers.get("Retry-After"),
+                )
+            if self.recording and not streamed:
+                self.recording.record(
+                    method,
+                    request_url(response),
+                    response.status_code,
+                    response.headers,
+                    response.content,
+                    redirected=bool(response.history),
+                )
+            return response
+
+    def get(self, path: str = "/", need_body: bool = False) -> CachedResponse:
+        return self.request("GET", path, need_body)
+
+    def head(self, path: str = "/") -> CachedResponse:
+        return self.request("HEAD", path)
+
+    def stream(self, path: str = "/", chunk_size: int = 1024):
+        """Yields the body of a GET in chunks. A cached body is replayed,
+        otherwise the response is streamed and closed as soon as the caller
+        stops reading, so wrap this in contextlib.closing."""
+        url = self.probes.url(path)
+        entry = self.cache.lookup("GET", url)
+        if entry is not None:
+            yield entry.content
+            return
+
+        with self._send("GET", url, stream=True) as response:
+            if self.recording is None:
+                for chunk in response.iter_content(chunk_size):
+                    self.metrics.add_received(len(chunk))
+                    yield chunk
+                return
+
+            chunks = []
+            complete = False
+            try:
+                for chunk in response.iter_content(chunk_size):
+                    self.metrics.add_received(len(chunk))
+                    chunks.append(chunk)
+                    yield chunk
+                complete = True
+            finally:
+                self.recording.record(
+                    "GET",
+                    request_url(response),
+                    response.status_code,
+                    response.headers,
+                    b"".join(chunks),
+                    redirected=bool(response.history),
+                    partial=not complete,
+                )
+
+    def close(self):
+        self.session.close()
@@ -1,53 +1,75 @@
-from typing import Self
+from typing import NamedTuple, Self
 
 
-class Url:
+class Url(NamedTuple):
     """A compliant, but non-exhaustive URL contianer. It does not handle
-    fragments, for example."""
+    fragments, for example. Urls are immutable tuples of the raw string and
+    the offsets of its parts, and joining a path returns a new one."""
 
-    def __init__(self, url_string: str):
-        self._raw = url_string
+    raw: str
 
-        # Components of a URL
-        self.scheme_end: int = -1
-        self.host_start: int = -1
-        self.host_end: int = -1
-        self.port: int | None = None
-        self.path_start: int | None = None
-        self.query_start: int | None = None
+    # Components of a URL
+    scheme_end: int = -1
+    host_start: int = -1
+    host_end: int = -1
+    port: int | None = None
+    path_start: int | None = None
+    query_start: int | None = None
 
     def __repr__(self) -> str:
-        return self._raw
+        return self.raw
 
-    def __add__(self, path: str) -> Self:
-        if path.startswith("/"):
-            path = path[1:]
-
-        if self._raw.endswith("/"):
-            self._raw = self._raw[:-1]
+    def __str__(self) -> str:
+        return self.raw
 
-        return Url.parse(self._raw + "/", path)
+    def __add__(self, path: str) -> Self:
+        """Joins path onto the url with a single slash between them. The
+        offsets of the scheme, host and port carry over, so nothing is
+        parsed again."""
+        if self.query_start is not None:
+            raise ValueError(f"url {self.raw} has a query to join a path to.")
+
+        raw = self.raw.rstrip("/")
+        path = path.lstrip("/")
+        query = path.find("?")
+        path_start = self.path_start
+        if path_start is None or path_start >= len(raw):
+            path_start = len(raw)
+        # tuple.__new__ skips the keyword handling of the generated __new__,
+        # which is most of the cost of a join.
+        return tuple.__new__(
+            Url,
+            (
+                raw + "/" + path,
+                self.scheme_end,
+                self.host_start,
+                self.host_end,
+                self.port,
+                path_start,
+                None if query == -1 else len(raw) + 1 + query,
+            ),
+        )
 
     @property
     def scheme(self) -> str:
-        return self._raw[: self.scheme_end]
+        return self.raw[: self.scheme_end]
 
     @property
     def host(self) -> str:
-        return self._raw[self.host_start : self.host_end]
+        return self.raw[self.host_start : self.host_end]
 
     @property
     def path(self) -> str | None:
         if self.path_start is not None:
             if self.query_start is not None:
-                return self._raw[self.path_start : self.query_start]
-            return self._raw[self.path_start :]
+                return self.raw[self.path_start : self.query_start]
+            return self.raw[self.path_start :]
         return None
 
     @property
     def query(self) -> str | None:
         if self.query_start:
-            return self._raw[self.query_start :]
+            return self.raw[self.query_start :]
         return None
 
     @classmethod
@@ -56,12 +78,18 @@ class Url:
 
         This method assumes the URL starts with http:// or https://.
         It determines the scheme, host (with optional port), path, and query.
+        User info before an @ is not part of the host, and an IPv6 host
+        keeps its brackets.
 
         Args:
             url_string (str): e.g. "http://foo.bar/baz?qux=hex"
 
         Returns:
             Self: An instance of Url with parsed parts.
+
+        Raises:
+            ValueError: When the scheme is not http or https, an IPv6 host is
+                not closed, or the port is not a number.
         """
         # Ensure the scheme is present.
         if not (
@@ -70,16 +98,13 @@ class Url:
         ):
             raise ValueError(f"url string {url_string} is missing a scheme.")
 
-        # Create a new instance and record the scheme end.
-        instance = cls(url_string)
-        instance.scheme_end = (
-            url_string.index("//") + 2
-        )  # the position after "http://" or "https://"
+        # Record the scheme end, the position after "http://" or "https://".
+        scheme_end = url_string.index("//") + 2
 
         # Find the first occurrence of "/" and "?" after the scheme.
         # These mark the beginnings of the path and query respectively.
-        first_slash = url_string.find("/", instance.scheme_end)
-        first_qmark = url_string.find("?", instance.scheme_end)
+        first_slash = url_string.find("/", scheme_end)
+        first_qmark = url_string.find("?", scheme_end)
 
         # The host ends where the first "/" or "?" appears.
         if first_slash == -1 and first_qmark == -1:
@@ -91,34 +116,56 @@ class Url:
         else:
             host_end = min(first_slash, first_qmark)
 
-        instance.host_start = instance.scheme_end
-        instance.host_end = host_end
+        # Skip the user info, e.g. "user:password@", before the host.
+        host_start = url_string.rfind("@", scheme_end, host_end) + 1
+        host_start = host_start or scheme_end
 
-        # Extract the host section from the URL.
-        host_str = url_string[instance.host_start : instance.host_end]
+        # The colons of an IPv6 host are inside its brackets.
+        port_search = host_start
+        if url_string.startswith("[", host_start):
+            port_search = url_string.find("]", host_start, host_end)
+            if port_search == -1:
+                raise ValueError(
+                    f"url {url_string} has an unclosed IPv6 host."
+                )
 
         # If a port is specified (after a colon) in the host, separate it.
-        if ":" in host_str:
-            host_only, port_str = host_str.split(":", 1)
+        port = None
+        colon = url_string.find(":", port_search, host_end)
+        if colon != -1:
+            try:
+                port = int(url_string[colon + 1 : host_end])
+            except ValueError:
+                raise ValueError(
+                    f"url {url_string} has an invalid port."
+                ) from None
             # Adjust the host_end to end at the port separator.
-            instance.host_end = instance.host_start + len(host_only)
-            instance.port = int(port_str)
-        else:
-            instance.port = None
+            host_end = colon
 
         # Process the path (if any)
         if first_slash != -1:
-            instance.path_start = first_slash
+            path_start = first_slash
             # If there's a query following the path, record its start.
             if first_qmark != -1 and first_qmark > first_slash:
-                instance.query_start = first_qmark
+                query_start = first_qmark
             else:
-                instance.query_start = None
+                query_start = None
         else:
-            instance.path_start = None
-            instance.query_start = first_qmark if first_qmark != -1 else None
-
-        return instance
+            path_start = None
+            query_start = first_qmark if first_qmark != -1 else None
+
+        return tuple.__new__(
+            cls,
+            (
+                url_string,
+                scheme_end,
+                host_start,
+                host_end,
+                port,
+                path_start,
+                query_start,
+            ),
+        )
 
 
 if __name__ == "__main__":
@@ -225,16 +272,17 @@ if __name__ == "__main__":
 
     url = Url.parse(test_urls[11])
     assert url.scheme == "http://"
-    assert url.host == "user@domain.com"
+    assert url.host == "domain.com"
     assert url.port is None
     assert url.path == "/path"
     assert url.query is None
 
-    try:
-        url = Url.parse(test_urls[12])
-        assert False, "IPv6 test should raise ValueError"
-    except ValueError:
-        pass
+    url = Url.parse(test_urls[12])
+    assert url.scheme == "http://"
+    assert url.host == "[::1]"
+    assert url.port == 8080
+    assert url.path == "/ipv6"
+    assert url.query is None
 
     url = Url.parse(test_urls[13])
     assert url.scheme == "https://"
@@ -284,4 +332,57 @@ if __name__ == "__main__":
     assert url.path == "/special_chars-_.~"
     assert url.query is None
 
+    base = Url.parse("https://example.com:8443/")
+    for joined, expected in (
+        (
+            base + "/components/com_k2/",
+            "https://example.com:8443/components/com_k2/",
+        ),
+        (
+            base + "index.php?option=com_k2",
+            "https://example.com:8443/index.php?option=com_k2",
+        ),
+        (
+            Url.parse("http://example.com/site") + "/robots.txt",
+            "http://example.com/site/robots.txt",
+        ),
+        (Url.parse("http://example.com") + "/", "http://example.com/"),
+    ):
+        parsed = Url.parse(expected)
+        assert str(joined) == expected
+        assert joined == parsed
+        for part in ("scheme", "host", "port", "path", "query"):
+            assert getattr(joined, part) == getattr(parsed, part), (
+                expected,
+                part,
+            )
+
+    url = Url.parse("http://user:pw@example.com:81/")
+    assert url.host == "example.com"
+    assert url.port == 81
+    assert url.path == "/"
+
+    url = Url.parse("http://[::1]")
+    assert url.host == "[::1]"
+    assert url.port is None
+
+    for invalid in ("http://[::1:80/", "http://example.com:http/"):
+        try:
+            Url.parse(invalid)
+            assert False, f"{invalid} should raise ValueError"
+        except ValueError:
+            pass
+
+    try:
+        Url.parse("http://example.com/?a=b") + "/c"
+        assert False, "joining onto a query should raise ValueError"
+    except ValueError:
+        pass
+
+    try:
+        base.port = 80
+        assert False, "Url should be immutable"
+    except AttributeError:
+        pass
+
     print("cases passed")
@@ -1,20 +1,81 @@
 import os
+from enum import Enum
+from pathlib import Path
 
+import rich
 from rich import print
-from typer import Option, Typer
+from typer import Exit, Option, Typer
 from typing_extensions import Annotated
 
-from joom3y.joom3y import scan
+from joom3y.components import database
+from joom3y.priority import History, default_history_path, rank
+from joom3y.probes import KINDS, Plan
 
 app = Typer()
 
 
+class Engine(str, Enum):
+    threads = "threads"
+    async_ = "async"
+
+
+class Output(str, Enum):
+    text = "text"
+    jsonl = "jsonl"
+
+
 @app.command()
 def main(
-    url: Annotated[str, Option("--url", "-u", help="The Joomla URL to scan.")],
+    url: Annotated[
+        str | None, Option("--url", "-u", help="The Joomla URL to scan.")
+    ] = None,
+    targets: Annotated[
+        str | None,
+        Option(
+            "--targets",
+            "-f",
+            help="A file of Joomla URLs to scan, one per line, or - for stdin.",
+        ),
+    ] = None,
+    per_host: Annotated[
+        int,
+        Option(
+            "--per-host",
+            help="Maximum number of concurrent requests to one host when scanning --targets.",
+        ),
+    ] = 4,
     threads: Annotated[
         int, Option("--threads", "-t", help="Number of threads to use.")
     ] = os.cpu_count(),
+    enrich_threads: Annotated[
+        int | None,
+        Option(
+            "--enrich-threads",
+            help="Number of threads probing the artifacts of found components. Defaults to --threads.",
+        ),
+    ] = None,
+    components: Annotated[
+        str | None,
+        Option(
+            "--components",
+            "-c",
+            help="Comma-separated glob patterns of the components to scan, e.g. 'com_a*'.",
+        ),
+    ] = None,
+    artifacts: Annotated[
+        str | None,
+        Option(
+            "--artifacts",
+            help=f"Comma-separated kinds of artifact to probe found components for, of {', '.join(KINDS)}. Defaults to all.",
+        ),
+    ] = None,
+    plan_only: Annotated[
+        bool,
+        Option(
+            "--plan",
+            help="Print how many requests the scan will send and exit without sending any.",
+        ),
+    ] = False,
     agent: Annotated[
         str | None, Option("--user-agent", "-a", help="The user agent to use.")
     ] = None,
@@ -26,17 +87,290 @@ def main(
             help="The timeout before moving on with an http request to joomla.",
         ),
     ] = 5,
+    engine: Annotated[
+        Engine,
+        Option(
+            "--engine",
+            "-e",
+            help="Run the component probes on a thread pool or an asyncio event loop.",
+        ),
+    ] = Engine.threads,
+    limit: Annotated[
+        int,
+        Option(
+            "--limit",
+            "-l",
+            help="Maximum number of requests in flight with the async engine.",
+        ),
+    ] = 1000,
+    http2: Annotated[
+        bool,
+        Option(
+            "--http2",
+            help="Multiplex the async engine's requests over a few HTTP/2 connections per host, on HTTPS targets that negotiate it, and fall back to HTTP/1.1 on the others.",
+        ),
+    ] = False,
+    adaptive: Annotated[
+        bool,
+        Option(
+            "--adaptive",
+            help="Adapt the requests in flight to the target's latency and errors, up to --threads (or --limit, or --per-host).",
+        ),
+    ] = False,
+    rate: Annotated[
+        float | None,
+        Option(
+            "--rate",
+            help="Maximum requests per second to any one hostname or IP address.",
+        ),
+    ] = None,
+    burst: Annotated[
+        int,
+        Option(
+            "--burst",
+            help="Requests allowed back to back before --rate applies.",
+        ),
+    ] = 1,
+    max_failures: Annotated[
+        int,
+        Option(
+            "--max-failures",
+            help="Connection failures or timeouts in a row that stop probing a host until it answers again.",
+        ),
+    ] = 5,
+    top: Annotated[
+        int | None,
+        Option(
+            "--top",
+            help="Only scan the N components most likely to be installed.",
+        ),
+    ] = None,
+    stop_after_misses: Annotated[
+        int | None,
+        Option(
+            "--stop-after-misses",
+            help="Stop scanning a site after K components in a row are not found.",
+        ),
+    ] = None,
+    history: Annotated[
+        Path,
+        Option(
+            "--history",
+            help="The file of past scan results used to order components.",
+        ),
+    ] = default_history_path(),
+    no_history: Annotated[
+        bool,
+        Option("--no-history", help="Don't read or update the scan history."),
+    ] = False,
+    journal: Annotated[
+        Path | None,
+        Option(
+            "--journal",
+            help="Record the progress of the scan in this file, to resume it if it is interrupted.",
+        ),
+    ] = None,
+    output: Annotated[
+        Output,
+        Option(
+            "--output",
+            "-o",
+            help="Print findings as console lines, or write them as JSON lines.",
+        ),
+    ] = Output.text,
+    output_file: Annotated[
+        Path | None,
+        Option(
+            "--output-file",
+            help="The file JSON lines are written to. Defaults to stdout.",
+        ),
+    ] = None,
+    metrics_file: Annotated[
+        Path | None,
+        Option(
+            "--metrics-file",
+            help="Write the scan's metrics to this Prometheus textfile, e.g. for node_exporter.",
+        ),
+    ] = None,
+    profile: Annotated[
+        Path | None,
+        Option(
+            "--profile",
+            help="Profile every thread of the scan and write the merged pstats to this file.",
+        ),
+    ] = None,
+    profile_top: Annotated[
+        int,
+        Option(
+            "--profile-top",
+            help="The number of functions in the --profile report.",
+        ),
+    ] = 20,
+    record: Annotated[
+        Path | None,
+        Option(
+            "--record",
+            help="Store every request of the scan and its response in this directory.",
+        ),
+    ] = None,
+    replay: Annotated[
+        Path | None,
+        Option(
+            "--replay",
+            help="Answer the scan's requests from a --record directory instead of the network.",
+        ),
+    ] = None,
+    resume: Annotated[
+        bool,
+        Option(
+            "--resume",
+            help="Skip the work recorded in --journal and continue the scan from there.",
+        ),
+    ] = False,
 ):
+    if (url is None) == (targets is None):
+        print("[red]Pass exactly one of --url or --targets.")
+        raise Exit(1)
+    if resume and journal is None:
+        print("[red]--resume needs the --journal of the scan to resume.")
+        raise Exit(1)
+    if record is not None and replay is not None:
+        print("[red]Pass at most one of --record or --replay.")
+        raise Exit(1)
+    if replay is not None and not (replay / "index.tsv").is_file():
+        print(f"[red]{replay} is not a --record directory.")
+        raise Exit(1)
+
+    selected = database().select(components)
+    if not selected:
+        print(f"[red]No components match {components}.")
+        raise Exit(1)
+
+    try:
+        plan = Plan(
+            None
+            if artifacts is None
+            else [
+                kind.strip() for kind in artifacts.split(",") if kind.strip()
+            ]
+        )
+    except ValueError as e:
+        print(f"[red]{e}")
+        raise Exit(1)
+
+    if plan_only:
+        ranked = rank(selected, History(None if no_history else history))[:top]
+        for line in plan.summary(ranked):
+            print(f"[blue]{line}")
+        if targets is not None:
+            print("[blue]The counts are per target.")
+        return
+
+    if output is Output.jsonl and output_file is None:
+        # Keep stdout for the findings, everything else goes to stderr.
+        rich.reconfigure(stderr=True)
+
+    if targets is not None and engine is not Engine.threads:
+        print("[red]--targets only supports the threads engine.")
+        raise Exit(1)
+    if http2 and engine is not Engine.async_:
+        print("[red]--http2 needs --engine async.")
+        raise Exit(1)
+
+    # Imported once the arguments are known to be good, so --help and usage
+    # errors don't pay for requests and the rest of the scan.
+    from joom3y.agents import random_user_agent
+    from joom3y.archive import Archive
+    from joom3y.findings import FindingWriter
+    from joom3y.journal import Journal
+    from joom3y.metrics import Metrics
+    from joom3y.ratelimit import RateLimiter
+
+    # Started first, so it covers the threads of everything below.
+    profiler = None
+    if profile is not None:
+        from joom3y.profiling import Profiler
+
+        profiler = Profiler()
+        profiler.start()
+
+    # A replay sends nothing, so it isn't rate limited, and it would only
+    # count the recorded scan's results twice in the history.
+    limiter = RateLimiter(rate, burst) if rate and replay is None else None
+    scans = History(None if no_history or replay is not None else history)
+    checkpoints = Journal(journal, resume)
+    archive = None
+    if record is not None or replay is not None:
+        archive = Archive(replay or record, replay=replay is not None)
+    findings = FindingWriter(output.value, output_file)
+    metrics = Metrics()
+    selected = rank(selected, scans)[:top]
+
     if agent is None:
-        from faker import Faker
-        from faker.providers import user_agent
+        agent = random_user_agent()
+        print("[blue]No user agent found, picked user agent is:", agent)
+
+    try:
+        if targets is not None:
+            from joom3y.targets import read_targets, scan_targets
 
-        fake = Faker()
-        fake.add_provider(user_agent)
-        agent = fake.user_agent()
-        print("[blue]No user agent found, generated user agent is:", agent)
+            scan_targets(
+                read_targets(targets),
+                agent,
+                timeout,
+                threads,
+                per_host,
+                components=selected,
+                history=scans,
+                stop_after_misses=stop_after_misses,
+                adaptive=adaptive,
+                limiter=limiter,
+                max_failures=max_failures,
+                journal=checkpoints,
+                findings=findings,
+                metrics=metrics,
+                archive=archive,
+                plan=plan,
+            )
+        else:
+            from joom3y.joom3y import scan
 
-    scan(url, agent, timeout, threads)
+            scan(
+                url,
+                agent,
+                timeout,
+                threads,
+                engine.value,
+                limit,
+                enrich_threads,
+                components=selected,
+                history=scans,
+                stop_after_misses=stop_after_misses,
+                adaptive=adaptive,
+                limiter=limiter,
+                max_failures=max_failures,
+                journal=checkpoints,
+                findings=findings,
+                metrics=metrics,
+                archive=archive,
+                plan=plan,
+                http2=http2,
+            )
+    finally:
+        if metrics_file is not None:
+            metrics.write_textfile(metrics_file)
+        findings.close()
+        checkpoints.close()
+        if archive is not None:
+            archive.close()
+        scans.save()
+        if profiler is not None:
+            rich.get_console().print(
+                profiler.save(profile, profile_top),
+                markup=False,
+                highlight=False,
+            )
+            print(f"[blue]Profile written to {profile}")
 
 
 if __name__ == "__main__":